@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+
+from atomic_json import write_json_atomic
+from http_cache import merge_articles
+
+class JsonlSink:
+    # 글을 파싱하는 즉시 한 줄씩 JSONL 파일에 추가
+    # 크롤링이 중간에 중단되어도 이미 저장된 글은 남고, 다시 실행하면 저장된 URL은 건너뜀
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self.seen = {article['url'] for article in read_jsonl(path)} if os.path.exists(path) else set()
+        self.written = 0
+        self._file = open(path, 'a', encoding='utf-8')
+        if self._file.tell() > 0 and not _ends_with_newline(path):
+            # 비정상 종료로 잘린 마지막 줄 뒤에 이어 쓰지 않도록 줄바꿈 추가
+            self._file.write('\n')
+
+    def write(self, article):
+        self._file.write(json.dumps(article, ensure_ascii=False) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.seen.add(article['url'])
+        self.written += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+def read_jsonl(path):
+    # 마지막 줄이 쓰다 만 상태(비정상 종료)라면 그 줄만 무시
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+def compact_jsonl(jsonl_path, json_path, base=None, remove=True):
+    # JSONL을 기존 crawled_articles.json 형식(들여쓰기 된 JSON 배열)으로 변환
+    # 같은 URL이 여러 번 기록되었다면 마지막 기록을 사용
+    # base(기존 코퍼스)가 주어지면 URL 기준으로 병합
+    latest = {}
+    for article in read_jsonl(jsonl_path):
+        latest[article['url']] = article
+
+    articles, added = merge_articles(base or [], latest.values())
+    write_json_atomic(articles, json_path, indent=2)
+
+    if remove:
+        os.remove(jsonl_path)
+    return articles, added
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("사용법: python article_sink.py <input.jsonl> <output.json>")
+        sys.exit(1)
+
+    articles, _ = compact_jsonl(sys.argv[1], sys.argv[2], remove=False)
+    print(f"Compacted {len(articles)} articles into '{sys.argv[2]}'")
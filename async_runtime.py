@@ -0,0 +1,62 @@
+import asyncio
+import concurrent.futures
+import queue
+import threading
+
+# 프로세스 전체가 공유하는 이벤트 루프 (백그라운드 데몬 스레드에서 실행)
+# Streamlit 스크립트처럼 동기 코드에서 코루틴/비동기 제너레이터를 이 루프에 넘겨 실행하므로,
+# 동시에 진행 중인 토론이 많아도 LLM 요청을 기다리는 일은 이 루프 하나가 모두 처리함
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def get_loop():
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='shared-event-loop', daemon=True).start()
+                _loop = loop
+    return _loop
+
+def run(coro, timeout=None):
+    # 공유 루프에서 코루틴을 실행하고 결과를 기다림 (timeout이 지나면 작업을 취소하고 TimeoutError)
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+_DONE = object()
+
+def iterate(agen, timeout=None):
+    # 비동기 제너레이터를 공유 루프에서 돌리며 값을 동기 제너레이터로 넘겨줌
+    # timeout은 다음 값을 기다리는 최대 시간, 호출한 쪽이 중간에 멈추면 비동기 제너레이터도 닫음
+    items = queue.Queue()
+
+    async def pump():
+        try:
+            async for item in agen:
+                items.put((item, None))
+        except BaseException as e:
+            items.put((_DONE, e))
+            raise
+        else:
+            items.put((_DONE, None))
+
+    future = asyncio.run_coroutine_threadsafe(pump(), get_loop())
+    try:
+        while True:
+            try:
+                item, error = items.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError("비동기 작업의 응답이 너무 오래 걸립니다.")
+            if item is _DONE:
+                if error is not None and not isinstance(error, asyncio.CancelledError):
+                    raise error
+                return
+            yield item
+    finally:
+        future.cancel()
@@ -0,0 +1,17 @@
+import json
+import os
+import tempfile
+
+# JSON 파일을 같은 디렉터리의 임시 파일에 쓴 뒤 교체하므로, 중간에 중단되어도 기존 파일이 깨지지 않음
+# (crawled_articles.json, HTTP 캐시, 정제 단계 캐시, 평가 캐시가 같이 사용)
+
+def write_json_atomic(data, path, indent=None):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
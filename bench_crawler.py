@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from crawling import PARSE_MODES, DEFAULT_PARSE_MODE, crawl_debate_site, crawl_debate_site_async, parse_article
+from crawl_pipeline import crawl_debate_site_pipeline
+from bench_parse import available_modes
+from fixture_server import FixtureServer, render_article
+from politeness import PolitenessScheduler
+
+# 로컬 fixture 서버를 대상으로 크롤러 모드별 성능을 측정 (네트워크 불필요)
+# 예: python bench_crawler.py --pages 11 --latency 0.05 --error-rate 0.02
+
+def run_sync(base_url, scheduler, parse_mode):
+    return crawl_debate_site(scheduler=scheduler, parse_mode=parse_mode, base_url=base_url)
+
+def run_async(base_url, scheduler, parse_mode):
+    return asyncio.run(crawl_debate_site_async(scheduler=scheduler, parse_mode=parse_mode, base_url=base_url))
+
+def run_pipeline(base_url, scheduler, parse_mode):
+    # 파싱 프로세스의 메모리는 tracemalloc에 잡히지 않으므로 peak 값은 메인 프로세스 기준
+    return asyncio.run(crawl_debate_site_pipeline(scheduler=scheduler, parse_mode=parse_mode, base_url=base_url))
+
+MODES = {
+    'sync': run_sync,
+    'async': run_async,
+    'pipeline': run_pipeline,
+}
+
+def bench_crawl(name, server, parse_mode, polite):
+    # 기본은 요청 간격 0으로 크롤러 자체의 처리량을 측정, --polite면 실제와 같은 스케줄러 설정 사용
+    scheduler = PolitenessScheduler() if polite else PolitenessScheduler(initial_delay=0.0)
+    requests_before, errors_before = server.requests, server.errors
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    articles = MODES[name](server.base_url, scheduler, parse_mode)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    requests = server.requests - requests_before
+    errors = server.errors - errors_before
+    return {
+        'mode': name,
+        'articles': len(articles),
+        'requests': requests,
+        'errors': errors,
+        'seconds': elapsed,
+        'pages_per_sec': requests / elapsed,
+        'peak_mb': peak / 1024 / 1024,
+    }
+
+def bench_parse(server, parse_modes, number=3):
+    # 크롤링과 분리해 글 페이지 하나를 파싱하는 데 걸리는 시간을 측정
+    pages = [render_article(article) for article in server.articles]
+    results = {}
+    for mode in parse_modes:
+        best = float('inf')
+        for _ in range(number):
+            start = time.perf_counter()
+            for html in pages:
+                parse_article(html, mode)
+            best = min(best, time.perf_counter() - start)
+        results[mode] = best / len(pages)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=11, help='목록 페이지 수 (페이지당 글 10개)')
+    parser.add_argument('--latency', type=float, default=0.05, help='응답 지연(초)')
+    parser.add_argument('--jitter', type=float, default=0.02, help='응답 지연에 더할 무작위 범위(초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503 응답 비율')
+    parser.add_argument('--modes', default=','.join(MODES), help='측정할 크롤러 모드 (쉼표로 구분)')
+    parser.add_argument('--parse-mode', choices=PARSE_MODES, default=DEFAULT_PARSE_MODE)
+    parser.add_argument('--polite', action='store_true', help='기본 요청 간격(1초에서 시작)을 그대로 사용')
+    args = parser.parse_args()
+
+    with FixtureServer(pages=args.pages, latency=args.latency, jitter=args.jitter,
+                       error_rate=args.error_rate) as server:
+        print(f"fixture: {args.pages} pages, {len(server.articles)} articles, "
+              f"latency {args.latency}+{args.jitter}s, error rate {args.error_rate}")
+
+        print(f"\n{'mode':<10}{'articles':>9}{'requests':>9}{'errors':>7}{'seconds':>9}{'pages/s':>9}{'peak MB':>9}")
+        for name in args.modes.split(','):
+            result = bench_crawl(name, server, args.parse_mode, args.polite)
+            print(f"{result['mode']:<10}{result['articles']:>9}{result['requests']:>9}{result['errors']:>7}"
+                  f"{result['seconds']:>9.2f}{result['pages_per_sec']:>9.1f}{result['peak_mb']:>9.1f}")
+
+        print(f"\n{'parse mode':<12}{'ms/page':>9}")
+        for mode, seconds in bench_parse(server, available_modes()).items():
+            print(f"{mode:<12}{seconds * 1000:>9.3f}")
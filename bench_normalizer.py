@@ -0,0 +1,41 @@
+import json
+import re
+import sys
+import timeit
+
+from normalizer import normalize_batch, normalize_text
+
+# 비교 기준: 기존 crawling.preprocess_text (정규식 3회 적용)
+def preprocess_text_regex(text):
+    text = re.sub(r'<.*?>', '', text)
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+def load_texts(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        articles = json.load(f)
+    return [text for article in articles for text in (article['title'], article['content'])]
+
+def bench(name, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{name:<28} {seconds * 1000:8.3f} ms / corpus")
+    return seconds
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else 'crawled_articles.json'
+    number = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    texts = load_texts(path)
+
+    # 크롤링 직후의 원문과 비슷하도록 태그와 문장 부호가 섞인 버전도 측정
+    raw_texts = [f"<p>{text.replace(' ', ' <br/> ', 10)}.</p>" for text in texts]
+
+    for label, corpus in (('crawled_articles.json', texts), ('with tags/punctuation', raw_texts)):
+        mismatches = sum(preprocess_text_regex(text) != normalize_text(text) for text in corpus)
+        print(f"[{label}] {len(corpus)} texts, {sum(map(len, corpus))} chars, mismatches: {mismatches}")
+
+        baseline = bench('preprocess_text (3 passes)', lambda: [preprocess_text_regex(t) for t in corpus], number)
+        single = bench('normalize_text', lambda: [normalize_text(t) for t in corpus], number)
+        batch = bench('normalize_batch', lambda: normalize_batch(corpus), number)
+        bench('normalize_batch (NFC)', lambda: normalize_batch(corpus, form='NFC'), number)
+        print(f"speedup: {baseline / single:.2f}x (single), {baseline / batch:.2f}x (batch)\n")
@@ -0,0 +1,71 @@
+import glob
+import json
+import os
+import sys
+import time
+
+from crawling import PARSE_MODES, parse_article, parse_listing
+from http_cache import DEFAULT_CACHE_DIR
+
+# 크롤링 때 쌓인 HTTP 캐시(.http_cache)나 .html 파일 디렉터리에서 페이지를 읽어 파싱 시간을 측정
+# 사용법: python bench_parse.py [캐시 또는 html 디렉터리] [반복 횟수]
+
+def load_pages(directory):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        pages.append((entry['url'], entry['body']))
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append((path, f.read()))
+    return pages
+
+def is_listing(url):
+    return '/page/' in url
+
+def available_modes():
+    modes = []
+    for mode in PARSE_MODES:
+        try:
+            parse_listing('<html></html>', mode)
+        except Exception as e:
+            print(f"skip {mode}: {e}")
+            continue
+        modes.append(mode)
+    return modes
+
+def bench(parse, pages, mode, number):
+    best = float('inf')
+    for _ in range(number):
+        start = time.perf_counter()
+        for _, html in pages:
+            parse(html, mode)
+        best = min(best, time.perf_counter() - start)
+    return best / len(pages)
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CACHE_DIR
+    number = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    pages = load_pages(directory)
+    listings = [page for page in pages if is_listing(page[0])]
+    articles = [page for page in pages if not is_listing(page[0])]
+    if not pages:
+        print(f"'{directory}'에 측정할 페이지가 없습니다. 먼저 crawling.py --incremental로 캐시를 채워주세요.")
+        sys.exit(1)
+    print(f"{len(listings)} listing pages, {len(articles)} article pages")
+
+    modes = available_modes()
+    for label, parse, group in (('listing', parse_listing, listings), ('article', parse_article, articles)):
+        if not group:
+            continue
+        # 모든 모드가 같은 결과를 내는지 먼저 확인
+        expected = [parse(html, 'full') for _, html in group]
+        baseline = None
+        for mode in modes:
+            mismatches = sum(parse(html, mode) != result for (_, html), result in zip(group, expected))
+            seconds = bench(parse, group, mode, number)
+            baseline = baseline or seconds
+            print(f"{label:<8} {mode:<9} {seconds * 1000:8.3f} ms/page  "
+                  f"speedup {baseline / seconds:5.2f}x  mismatches {mismatches}")
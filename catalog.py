@@ -0,0 +1,123 @@
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 토론 주제(debate_topics.json)와 캐릭터(characters.json)를 프로세스 전체에서 한 번만 읽어 두는 카탈로그
+# - Streamlit은 클릭마다 스크립트를 다시 실행하므로, 세션마다 JSON을 다시 읽지 않도록 모든 세션이 같은 카탈로그를 공유
+# - 주제는 keyword/type별로, 캐릭터는 char_type별로 미리 색인해 조회가 O(1)
+# - 파일 수정 시각(mtime)이 바뀌었을 때만 다시 읽음 (확인은 CHECK_INTERVAL초에 한 번, stat만 호출)
+# - 다시 읽다가 실패하면(저장 중인 파일, 잘못된 JSON, 파일 없음) 오류를 로그에 남기고 이전 스냅샷을 계속 사용
+#   처음 읽을 때(force=True)만 예외를 올림
+
+TOPICS_PATH = 'debate_topics.json'
+CHARACTERS_PATH = 'characters.json'
+CHECK_INTERVAL = 2.0
+
+def _signature(path):
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError as e:
+        logger.error(f"파일을 찾을 수 없습니다: {e}")
+        raise
+    except json.JSONDecodeError as e:
+        logger.error(f"JSON 파일 파싱 오류: {e}")
+        raise
+
+class _Snapshot:
+    # 한 시점의 파일 내용과 색인 (만든 뒤에는 바꾸지 않으므로 여러 스레드가 잠금 없이 읽어도 됨)
+    def __init__(self, topics, characters, signatures):
+        self.topics = topics
+        self.characters = characters
+        self.signatures = signatures
+        self.topic_by_keyword = {topic['keyword']: topic for topic in topics}
+        self.topics_by_type = {}
+        for topic in topics:
+            self.topics_by_type.setdefault(topic['type'], []).append(topic)
+        self.character_by_type = {char['char_type']: char for char in characters['characters']}
+
+class DataCatalog:
+    def __init__(self, topics_path=TOPICS_PATH, characters_path=CHARACTERS_PATH, check_interval=CHECK_INTERVAL):
+        self.topics_path = topics_path
+        self.characters_path = characters_path
+        self.check_interval = check_interval
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._snapshot = None
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        # 마지막 확인 후 check_interval이 지났고 파일이 바뀌었으면 다시 읽음, 다시 읽었으면 True
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return False
+        with self._lock:
+            if not force and now - self._checked_at < self.check_interval:
+                return False
+            self._checked_at = now
+            try:
+                signatures = (_signature(self.topics_path), _signature(self.characters_path))
+                if self._snapshot is not None and self._snapshot.signatures == signatures:
+                    return False
+                snapshot = _Snapshot(_read_json(self.topics_path), _read_json(self.characters_path), signatures)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                if force or self._snapshot is None:
+                    raise
+                logger.error(f"카탈로그를 다시 읽지 못해 이전 내용을 계속 사용합니다: {e!r}")
+                return False
+            self._snapshot = snapshot
+            self.loads += 1
+            logger.info(f"카탈로그 로드: 주제 {len(self._snapshot.topics)}개, "
+                        f"캐릭터 {len(self._snapshot.character_by_type)}개 ({self.loads}번째)")
+            return True
+
+    @property
+    def snapshot(self):
+        self.refresh()
+        return self._snapshot
+
+    @property
+    def topics(self):
+        return self.snapshot.topics
+
+    @property
+    def characters(self):
+        # characters.json 원본 ({'characters': [...]})
+        return self.snapshot.characters
+
+    def topic(self, keyword):
+        return self.snapshot.topic_by_keyword[keyword]
+
+    def character(self, char_type):
+        return self.snapshot.character_by_type[char_type]
+
+    def topic_types(self):
+        # 파일에 처음 나온 순서대로
+        return list(self.snapshot.topics_by_type)
+
+    def topics_of_type(self, topic_type):
+        return self.snapshot.topics_by_type.get(topic_type, [])
+
+    def character_types(self):
+        return list(self.snapshot.character_by_type)
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def get_catalog():
+    # 프로세스 전체에서 하나의 카탈로그를 공유
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = DataCatalog()
+    return _catalog
@@ -0,0 +1,36 @@
+# 글을 프롬프트에 넣기 좋은 크기의 문단(passage)으로 나누는 도구
+# 글 평균 길이가 1.7천 자, 최대 3.6천 자라 글 단위로는 너무 크므로 어절 경계에서 겹치게 자름
+
+PASSAGE_SIZE = 400      # 문단 하나의 대략적인 글자 수
+OVERLAP = 100           # 앞 문단과 겹치는 대략적인 글자 수 (문단 경계에 걸친 문장도 찾을 수 있도록)
+
+def chunk_text(text, size=PASSAGE_SIZE, overlap=OVERLAP):
+    # size 글자 안팎의 문단으로 자르고, 다음 문단은 앞 문단의 마지막 overlap 글자 분량 어절부터 시작
+    words = text.split()
+    passages = []
+    start = 0
+    while start < len(words):
+        end, length = start, 0
+        while end < len(words) and length < size:
+            length += len(words[end]) + 1
+            end += 1
+        passages.append(' '.join(words[start:end]))
+        if end >= len(words):
+            break
+
+        # 겹칠 어절 수 계산 (최소 한 어절은 앞으로 나아가도록)
+        back, kept = end, 0
+        while back > start + 1 and kept < overlap:
+            back -= 1
+            kept += len(words[back]) + 1
+        start = back if overlap > 0 else end
+    return passages
+
+def chunk_articles(articles, size=PASSAGE_SIZE, overlap=OVERLAP):
+    # [{'title', 'url', 'text', 'article_index', 'chunk'}, ...]
+    return [
+        {'title': article['title'], 'url': article['url'], 'text': text,
+         'article_index': article_index, 'chunk': chunk}
+        for article_index, article in enumerate(articles)
+        for chunk, text in enumerate(chunk_text(article['content'], size, overlap))
+    ]
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import re
+import sys
+
+from atomic_json import write_json_atomic
+from dedupe import dedupe
+from normalizer import normalize_text
+
+# 설정 파일(cleaning_config.json)에 적힌 순서대로 코퍼스 정제 단계를 실행
+# 각 단계의 결과는 (단계 설정 + 입력 내용)의 해시로 캐시하므로,
+# 규칙을 바꾸고 다시 실행하면 바뀐 단계와 그 영향을 받는 글만 다시 계산함
+#
+# 단계 종류
+# - 글 단위(map) 단계: 글 하나씩 처리, 글마다 캐시 (filter, normalize, length_bucket)
+# - 코퍼스 단위 단계: 전체 글을 한 번에 처리, 입력 전체의 해시로 캐시 (dedupe, renumber)
+
+DEFAULT_CONFIG = 'cleaning_config.json'
+DEFAULT_CACHE_DIR = '.clean_cache'
+
+def digest(value):
+    return hashlib.sha256(json.dumps(value, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+# 글 단위 단계: (글, 설정) -> 글 또는 None(제거)
+
+def filter_article(article, config):
+    if article['url'] in set(config.get('drop_urls', [])):
+        return None
+    if len(article['content']) < config.get('min_length', 0):
+        return None
+    for pattern in config.get('drop_title_patterns', []):
+        if re.search(pattern, article['title']):
+            return None
+    return article
+
+def normalize_article(article, config):
+    form = config.get('form')
+    return dict(article, title=normalize_text(article['title'], form), content=normalize_text(article['content'], form))
+
+def bucket_article(article, config):
+    # buckets: [[이름, 최대 길이], ..., [이름, null]] — 본문 길이가 처음으로 최대 길이 이하가 되는 구간
+    length = len(article['content'])
+    for name, limit in config['buckets']:
+        if limit is None or length <= limit:
+            return dict(article, length_bucket=name)
+    return dict(article, length_bucket=config['buckets'][-1][0])
+
+# 코퍼스 단위 단계: (글 목록, 설정) -> 글 목록
+
+def dedupe_corpus(articles, config):
+    kept, report = dedupe(articles, config.get('threshold', 0.8))
+    for cluster in report:
+        dropped = ', '.join(str(item['index']) for item in cluster['dropped'])
+        print(f"  dedupe: kept #{cluster['kept']['index']} '{cluster['kept']['title']}', dropped #{dropped}")
+    return kept
+
+def renumber_corpus(articles, config):
+    start = config.get('start', 1)
+    return [dict(article, id=i + start) for i, article in enumerate(articles)]
+
+MAP_STAGES = {
+    'filter': filter_article,
+    'normalize': normalize_article,
+    'length_bucket': bucket_article,
+}
+
+CORPUS_STAGES = {
+    'dedupe': dedupe_corpus,
+    'renumber': renumber_corpus,
+}
+
+class StageCache:
+    # 단계 설정 해시별로 하나의 JSON 파일에 {입력 해시: 결과}를 저장
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, stage_key):
+        return os.path.join(self.cache_dir, f"{stage_key}.json")
+
+    def load(self, stage_key):
+        try:
+            with open(self._path(stage_key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save(self, stage_key, entries):
+        write_json_atomic(entries, self._path(stage_key))
+
+def run_map_stage(func, config, articles, cache, stage_key):
+    entries = cache.load(stage_key)
+    results = []
+    computed = 0
+    for article in articles:
+        key = digest(article)
+        if key not in entries:
+            entries[key] = func(article, config)
+            computed += 1
+        if entries[key] is not None:
+            results.append(entries[key])
+    if computed:
+        cache.save(stage_key, entries)
+    return results, computed
+
+def run_corpus_stage(func, config, articles, cache, stage_key):
+    entries = cache.load(stage_key)
+    key = digest([digest(article) for article in articles])
+    if key in entries:
+        return entries[key], 0
+    # 코퍼스 단위 단계는 입력이 바뀔 때마다 결과가 하나씩 쌓이지 않도록 최신 결과만 보관
+    result = func(articles, config)
+    cache.save(stage_key, {key: result})
+    return result, len(articles)
+
+def run_pipeline(config, cache_dir=DEFAULT_CACHE_DIR):
+    with open(config['input'], 'r', encoding='utf-8') as f:
+        articles = json.load(f)
+
+    cache = StageCache(config.get('cache_dir', cache_dir))
+    for stage in config['stages']:
+        name = stage['name']
+        # 단계 이름과 설정이 같으면 같은 캐시를 사용 (설정을 바꾸면 새 캐시)
+        stage_key = f"{name}-{digest(stage)[:16]}"
+        before = len(articles)
+        if name in MAP_STAGES:
+            articles, computed = run_map_stage(MAP_STAGES[name], stage, articles, cache, stage_key)
+        elif name in CORPUS_STAGES:
+            articles, computed = run_corpus_stage(CORPUS_STAGES[name], stage, articles, cache, stage_key)
+        else:
+            raise ValueError(f"Unknown cleaning stage: {name}")
+        print(f"[{name}] {before} -> {len(articles)} articles ({computed} computed, {before - computed} cached)")
+
+    return articles
+
+def load_config(path=DEFAULT_CONFIG):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def main(config_path=DEFAULT_CONFIG):
+    # 설정대로 정제한 글 목록을 config['output']에 저장 (cleaning.py와 preprocessing.py의 공통 진입점)
+    config = load_config(config_path)
+    articles = run_pipeline(config)
+
+    with open(config['output'], 'w', encoding='utf-8') as f:
+        json.dump(articles, f, ensure_ascii=False, indent=2)
+
+    print(f"Cleaned data saved to '{config['output']}'. Total articles: {len(articles)}")
+    return articles
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CONFIG)
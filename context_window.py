@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import math
+import threading
+
+import async_runtime
+from resilience import llm_guard
+
+logger = logging.getLogger(__name__)
+
+# 대화 기록을 매 요청마다 전부 보내지 않도록 관리하는 컨텍스트 창
+# - 최근 keep_turns턴은 그대로 보내고, 그보다 오래된 턴은 백그라운드에서 요약해 running summary에 합침
+# - 요약이 끝나기 전까지는 아직 합치지 못한 턴을 그대로 보냄 (응답을 기다리게 하지 않음)
+# - 요청마다 (요약 + 보낼 대화)가 token_budget을 넘지 않도록 오래된 턴부터 버리고, 그래도 넘으면 요약을 자름
+#   마지막 사용자 발언은 항상 보냄
+
+KEEP_TURNS = 4
+TOKEN_BUDGET = 2000
+SUMMARY_MODEL = "claude-3-haiku-20240307"
+SUMMARY_MAX_TOKENS = 400
+
+# 요약 요청은 비동기 클라이언트로 async_runtime의 공유 이벤트 루프에서 실행
+# (세션마다 독립적으로 진행되므로 동시에 진행 중인 토론이 많아도 서로의 요약이나 재시도 대기 뒤에 줄 서지 않음)
+
+def estimate_tokens(text):
+    # 토크나이저 없이 대략 추정: 한글은 글자당 1토큰 안팎, 영문은 3~4글자당 1토큰 정도라 UTF-8 3바이트를 1토큰으로 봄
+    return math.ceil(len(text.encode('utf-8')) / 3)
+
+def format_turns(turns):
+    return "\n".join(f"사용자: {user}\nAI: {assistant}" for user, assistant in turns)
+
+class ContextWindow:
+    def __init__(self, async_client, keep_turns=KEEP_TURNS, token_budget=TOKEN_BUDGET, model=SUMMARY_MODEL):
+        self.async_client = async_client
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+        self.model = model
+        self.summary = ""
+        self.turns = []         # 아직 요약에 합치지 않은 (사용자, AI) 턴
+        self.folded_turns = 0   # 요약에 합친 턴 수
+        self.dropped_turns = 0  # 예산 때문에 요청에서 뺀 턴 수 (누적)
+        self._lock = threading.RLock()   # 이미 끝난 Future에 붙인 콜백은 잠금을 잡은 스레드에서 바로 실행됨
+        self._pending = None
+
+    def add_turn(self, user, assistant):
+        with self._lock:
+            self.turns.append((user, assistant))
+            self._maybe_fold()
+
+    def _maybe_fold(self):
+        # 잠금을 잡은 상태에서 호출
+        if self._pending is not None or len(self.turns) <= self.keep_turns:
+            return
+        batch = self.turns[:len(self.turns) - self.keep_turns]
+        self._pending = asyncio.run_coroutine_threadsafe(self._summarize(self.summary, batch), async_runtime.get_loop())
+        self._pending.add_done_callback(lambda future: self._finish_fold(future, len(batch)))
+
+    async def _summarize(self, summary, turns):
+        prompt = f"""다음은 토론의 이전 요약과 그 뒤에 이어진 대화입니다.
+        양측의 핵심 주장, 근거, 반박 흐름이 드러나도록 한국어로 다섯 문장 이내의 요약을 새로 작성하세요. 요약만 출력하세요.
+
+        이전 요약: {summary or "(없음)"}
+
+        이어진 대화:
+        {format_turns(turns)}"""
+        response = await llm_guard.acall(
+            self.async_client.messages.create,
+            name="대화 요약",
+            model=self.model,
+            max_tokens=SUMMARY_MAX_TOKENS,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.content[0].text.strip()
+
+    def _finish_fold(self, future, count):
+        with self._lock:
+            self._pending = None
+            try:
+                self.summary = future.result()
+            except Exception as e:
+                # 요약에 실패하면 턴을 그대로 두고 다음 턴에 다시 시도 (그 사이에는 예산 안에서 원문을 보냄)
+                logger.error(f"대화 요약 중 오류 발생: {e}")
+                return
+            del self.turns[:count]
+            self.folded_turns += count
+            logger.info(f"대화 {count}턴을 요약에 합침 (누적 {self.folded_turns}턴, 요약 {estimate_tokens(self.summary)}토큰)")
+            self._maybe_fold()
+
+    def build(self, user_input):
+        # 이번 요청에 보낼 (요약, messages)를 반환
+        with self._lock:
+            summary = self.summary
+            turns = list(self.turns)
+
+        budget = self.token_budget - estimate_tokens(user_input)
+        costs = [estimate_tokens(user) + estimate_tokens(assistant) for user, assistant in turns]
+        dropped = 0
+        while turns and estimate_tokens(summary) + sum(costs) > budget:
+            turns.pop(0)
+            costs.pop(0)
+            dropped += 1
+        if estimate_tokens(summary) > budget:
+            # 요약이 예산보다 길면 앞부분만 남김 (글자당 최소 1토큰으로 보고 자름)
+            summary = summary[:max(budget, 0)]
+        if dropped:
+            self.dropped_turns += dropped
+            logger.info(f"토큰 예산({self.token_budget}) 때문에 오래된 대화 {dropped}턴을 요청에서 제외")
+
+        messages = []
+        for user, assistant in turns:
+            messages.append({"role": "user", "content": user})
+            messages.append({"role": "assistant", "content": assistant})
+        messages.append({"role": "user", "content": user_input})
+        return summary, messages
+
+    def wait(self, timeout=None):
+        # 진행 중인 요약이 끝날 때까지 기다림 (요약이 연달아 이어지면 모두 끝날 때까지)
+        while True:
+            with self._lock:
+                pending = self._pending
+            if pending is None:
+                return
+            pending.exception(timeout)
@@ -0,0 +1,135 @@
+import json
+import mmap
+import os
+import struct
+import sys
+
+# crawled_articles.json을 mmap으로 여는 바이너리 형식으로 변환해 필요한 글만 읽을 수 있게 함
+#
+# <이름>.bin: 모든 글의 title, content, url을 이어 붙인 UTF-8 바이트열
+# <이름>.idx: 헤더(MAGIC, 버전, 글 수) + 글마다 고정 길이 레코드
+#             (blob 시작 위치, title 길이, content 길이, url 길이, id) — 길이는 바이트 단위
+#
+# i번째 글의 레코드는 HEADER.size + i * RECORD.size에 있으므로 JSON 전체를 파싱하지 않고 바로 읽을 수 있음
+
+MAGIC = b'TDKC'
+VERSION = 1
+HEADER = struct.Struct('<4sII')
+RECORD = struct.Struct('<QIIIi')
+NO_ID = -1
+
+def store_paths(prefix):
+    return prefix + '.bin', prefix + '.idx'
+
+def default_prefix(json_path):
+    return os.path.splitext(json_path)[0]
+
+def convert(json_path, prefix=None):
+    # JSON 코퍼스를 .bin/.idx로 변환하고 글 수를 반환
+    prefix = prefix or default_prefix(json_path)
+    blob_path, index_path = store_paths(prefix)
+    with open(json_path, 'r', encoding='utf-8') as f:
+        articles = json.load(f)
+
+    offset = 0
+    with open(blob_path, 'wb') as blob, open(index_path, 'wb') as index:
+        index.write(HEADER.pack(MAGIC, VERSION, len(articles)))
+        for article in articles:
+            fields = [article[key].encode('utf-8') for key in ('title', 'content', 'url')]
+            index.write(RECORD.pack(offset, *(len(field) for field in fields), article.get('id', NO_ID)))
+            for field in fields:
+                blob.write(field)
+            offset += sum(len(field) for field in fields)
+    return len(articles)
+
+class CorpusReader:
+    # with CorpusReader('crawled_articles') as corpus:
+    #     corpus[0], corpus.get_by_id(3), corpus[10:20], corpus.content(5)
+    def __init__(self, prefix):
+        blob_path, index_path = store_paths(prefix)
+        self._files = [open(blob_path, 'rb'), open(index_path, 'rb')]
+        # 빈 파일은 mmap할 수 없으므로 글이 없으면 빈 bytes로 대신함
+        self._blob = (mmap.mmap(self._files[0].fileno(), 0, access=mmap.ACCESS_READ)
+                      if os.path.getsize(blob_path) else b'')
+        self._index = mmap.mmap(self._files[1].fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = HEADER.unpack_from(self._index, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported corpus store: {index_path}")
+        self._count = count
+        self._ids = None
+
+    def __len__(self):
+        return self._count
+
+    def _record(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return RECORD.unpack_from(self._index, HEADER.size + index * RECORD.size)
+
+    def _field(self, start, length):
+        return self._blob[start:start + length].decode('utf-8')
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        offset, title_len, content_len, url_len, article_id = self._record(index)
+        article = {
+            'title': self._field(offset, title_len),
+            'content': self._field(offset + title_len, content_len),
+            'url': self._field(offset + title_len + content_len, url_len),
+        }
+        if article_id != NO_ID:
+            article['id'] = article_id
+        return article
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def title(self, index):
+        offset, title_len, _, _, _ = self._record(index)
+        return self._field(offset, title_len)
+
+    def content(self, index):
+        offset, title_len, content_len, _, _ = self._record(index)
+        return self._field(offset + title_len, content_len)
+
+    def get_by_id(self, article_id):
+        # id -> 인덱스 표는 처음 호출될 때 인덱스 파일만 훑어서 만듦 (blob은 읽지 않음)
+        if self._ids is None:
+            body = memoryview(self._index)[HEADER.size:HEADER.size + self._count * RECORD.size]
+            self._ids = {record[4]: i for i, record in enumerate(RECORD.iter_unpack(body))}
+            body.release()
+        return self[self._ids[article_id]]
+
+    def close(self):
+        if isinstance(self._blob, mmap.mmap):
+            self._blob.close()
+        self._index.close()
+        for f in self._files:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_corpus(json_path):
+    # 변환된 저장소가 JSON보다 최신이면 CorpusReader를, 아니면 JSON을 읽은 리스트를 반환
+    # 두 경우 모두 len(), 인덱싱, 순회를 같은 방식으로 쓸 수 있음
+    blob_path, index_path = store_paths(default_prefix(json_path))
+    if (os.path.exists(index_path) and os.path.exists(blob_path)
+            and os.path.getmtime(index_path) >= os.path.getmtime(json_path)):
+        return CorpusReader(default_prefix(json_path))
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+if __name__ == "__main__":
+    json_path = sys.argv[1] if len(sys.argv) > 1 else 'crawled_articles.json'
+    prefix = sys.argv[2] if len(sys.argv) > 2 else default_prefix(json_path)
+    count = convert(json_path, prefix)
+    print(f"Converted {count} articles into '{prefix}.bin' / '{prefix}.idx'")
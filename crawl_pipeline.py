@@ -0,0 +1,147 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from crawling import (BASE_URL, DEFAULT_MAX_PER_HOST, DEFAULT_PARSE_MODE, REQUEST_TIMEOUT, HostLimiter,
+                      fetch_page_async, iter_listing_pages_async, load_robots_async, parse_article, parse_listing)
+from politeness import PolitenessScheduler
+
+# 단계 사이의 큐 종료 신호
+_DONE = None
+
+# 크롤링 파이프라인
+#   목록 수집 -> [URL 큐] -> 비동기 fetcher N개 -> [HTML 큐(크기 제한)] -> 프로세스 풀 파서 -> [결과 큐] -> writer
+# HTML 큐가 가득 차면 fetcher가 기다리므로(backpressure) 파싱이 밀려도 메모리가 무한히 늘지 않고,
+# 파싱은 여러 코어에서 병렬로 돌아가므로 네트워크 대기와 CPU 작업이 서로를 막지 않음
+
+def parse_article_task(position, url, html, mode):
+    # 프로세스 풀에서 실행되는 작업 (pickle 가능한 최상위 함수여야 함)
+    title, content = parse_article(html, mode)
+    return position, {
+        'title': title,
+        'content': content,
+        'url': url
+    }
+
+class PipelineStats:
+    def __init__(self):
+        self.fetched = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.parsed = 0
+        self.html_queue_peak = 0
+
+    def __repr__(self):
+        return (f"fetched={self.fetched} unchanged={self.unchanged} failed={self.failed} "
+                f"parsed={self.parsed} html_queue_peak={self.html_queue_peak}")
+
+async def _list_articles(client, limiter, scheduler, cache, sink, known_urls, loop, pool, parse_mode, url_queue,
+                         base_url):
+    # 목록 페이지를 찾아가며 받아오고(파싱은 프로세스 풀), 페이지가 끝나는 대로 글 URL을 큐에 넣음
+    async def parse_in_pool(html):
+        return await loop.run_in_executor(pool, parse_listing, html, parse_mode)
+
+    async for page, urls in iter_listing_pages_async(client, limiter, scheduler, cache, known_urls,
+                                                     parse_mode, parse=parse_in_pool, base_url=base_url):
+        for index, url in enumerate(urls):
+            if sink is None or url not in sink.seen:
+                await url_queue.put(((page, index), url))
+        print(f"Processed page {page}")
+
+async def _fetcher(client, limiter, scheduler, cache, url_queue, html_queue, stats):
+    while True:
+        item = await url_queue.get()
+        if item is _DONE:
+            break
+        position, url = item
+        try:
+            html, changed = await fetch_page_async(client, limiter, scheduler, url, cache, defer=True)
+        except httpx.HTTPError as e:
+            stats.failed += 1
+            print(f"Failed to fetch {url}: {e}")
+            continue
+        stats.fetched += 1
+        if not changed:
+            stats.unchanged += 1
+            continue
+        await html_queue.put((position, url, html))
+        stats.html_queue_peak = max(stats.html_queue_peak, html_queue.qsize())
+
+async def _parser(loop, pool, parse_mode, html_queue, result_queue, stats):
+    while True:
+        item = await html_queue.get()
+        if item is _DONE:
+            break
+        position, url, html = item
+        try:
+            result = await loop.run_in_executor(pool, parse_article_task, position, url, html, parse_mode)
+        except Exception as e:
+            # 구조가 다른 페이지 하나 때문에 파이프라인 전체가 멈추지 않도록 건너뜀
+            stats.failed += 1
+            print(f"Failed to parse {url}: {e}")
+            continue
+        stats.parsed += 1
+        await result_queue.put(result)
+
+async def _writer(result_queue, sink, cache, results):
+    # sink에 기록한 글만 캐시에 반영 (파싱에 실패한 글은 다음 실행에서 다시 받음)
+    while True:
+        item = await result_queue.get()
+        if item is _DONE:
+            break
+        position, article = item
+        if sink is not None:
+            sink.write(article)
+            if cache is not None:
+                cache.commit(article['url'])
+        else:
+            results.append((position, article))
+
+async def crawl_debate_site_pipeline(fetchers=8, parse_workers=None, queue_size=32,
+                                     max_per_host=DEFAULT_MAX_PER_HOST, timeout=REQUEST_TIMEOUT,
+                                     scheduler=None, cache=None, sink=None, parse_mode=DEFAULT_PARSE_MODE,
+                                     known_urls=None, base_url=BASE_URL):
+    # sink가 없으면 글을 동기 크롤러와 같은 순서(페이지, 페이지 내 순서)로 정렬해 반환
+    parse_workers = parse_workers or os.cpu_count() or 1
+    limits = httpx.Limits(max_connections=max_per_host, max_keepalive_connections=max_per_host)
+    limiter = HostLimiter(max_per_host)
+    scheduler = scheduler or PolitenessScheduler()
+    stats = PipelineStats()
+    loop = asyncio.get_running_loop()
+    start = time.monotonic()
+
+    url_queue = asyncio.Queue()
+    html_queue = asyncio.Queue(maxsize=queue_size)
+    result_queue = asyncio.Queue(maxsize=queue_size)
+    results = []
+
+    with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+        async with httpx.AsyncClient(limits=limits, timeout=timeout, follow_redirects=True) as client:
+            await load_robots_async(client, scheduler, base_url)
+
+            fetch_tasks = [asyncio.create_task(_fetcher(client, limiter, scheduler, cache, url_queue, html_queue, stats))
+                           for _ in range(fetchers)]
+            parse_tasks = [asyncio.create_task(_parser(loop, pool, parse_mode, html_queue, result_queue, stats))
+                           for _ in range(parse_workers)]
+            writer_task = asyncio.create_task(_writer(result_queue, sink, cache, results))
+
+            # 앞 단계가 끝나면 다음 단계 작업자 수만큼 종료 신호를 보내 순서대로 정리
+            await _list_articles(client, limiter, scheduler, cache, sink, known_urls, loop, pool, parse_mode, url_queue,
+                                 base_url)
+            for _ in fetch_tasks:
+                await url_queue.put(_DONE)
+            await asyncio.gather(*fetch_tasks)
+
+        for _ in parse_tasks:
+            await html_queue.put(_DONE)
+        await asyncio.gather(*parse_tasks)
+        await result_queue.put(_DONE)
+        await writer_task
+
+    print(f"Pipeline: {stats} in {time.monotonic() - start:.1f}s")
+    print(f"Crawl rate: {scheduler.stats()}")
+    results.sort(key=lambda item: item[0])
+    return [article for _, article in results]
@@ -1,62 +1,384 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import time
-import re
-from transformers import BertTokenizer
 import json
+import asyncio
+import argparse
+import os
+import re
+import sys
+from urllib.parse import unquote, urlsplit
+
+import httpx
+
+from politeness import PolitenessScheduler, THROTTLE_STATUSES, parse_retry_after
+from http_cache import HttpCache, merge_articles
+from article_sink import JsonlSink, compact_jsonl
+from normalizer import normalize_text
+
+BASE_URL = "http://www.realdebate.co.kr/category/%ed%86%a0%eb%a1%a0%ec%9e%90%eb%a3%8c%ec%8b%a4/%ed%86%a0%eb%a1%a0%ea%b5%90%ec%9c%a1/page/{}/"
+# 목록 페이지 수는 고정하지 않고 페이지네이션 링크(/page/N/)에서 찾음
+PAGE_LINK = re.compile(r'/page/(\d+)/?$')
+
+# 비동기 크롤링 시 호스트당 동시 요청 수 기본값
+DEFAULT_MAX_PER_HOST = 4
+REQUEST_TIMEOUT = 10.0
+# 429/5xx 응답 시 스케줄러가 간격을 늘린 뒤 재시도하는 최대 횟수
+MAX_ATTEMPTS = 3
 
 def preprocess_text(text):
-    # HTML 태그 제거
-    text = re.sub(r'<.*?>', '', text)
-    # 특수 문자 제거
-    text = re.sub(r'[^\w\s]', '', text)
-    # 여러 개의 공백을 하나로 치환
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
-def get_article_content(url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    
+    # HTML 태그 제거, 특수 문자 제거, 공백 정리를 한 번에 처리 (normalizer.py 참고)
+    return normalize_text(text)
+
+# 파싱 모드
+# - full: 페이지 전체를 html.parser로 파싱 (기존 방식)
+# - strained: 필요한 요소(목록의 article, 본문의 entry-title/entry-content)만 트리로 만듦
+# - lxml: strained와 같은 필터를 lxml 파서로 파싱 (lxml 설치 필요)
+PARSE_MODES = ('full', 'strained', 'lxml')
+DEFAULT_PARSE_MODE = 'full'
+
+LISTING_STRAINER = SoupStrainer('article', itemtype="http://schema.org/BlogPosting")
+ARTICLE_STRAINER = SoupStrainer(class_=['entry-title', 'entry-content'])
+
+def make_soup(html, mode, strainer):
+    if mode == 'full':
+        return BeautifulSoup(html, 'html.parser')
+    if mode == 'strained':
+        return BeautifulSoup(html, 'html.parser', parse_only=strainer)
+    if mode == 'lxml':
+        return BeautifulSoup(html, 'lxml', parse_only=strainer)
+    raise ValueError(f"Unknown parse mode: {mode}")
+
+def parse_listing(html, mode=DEFAULT_PARSE_MODE):
+    # 목록 페이지에서 게시글 URL만 추출
+    soup = make_soup(html, mode, LISTING_STRAINER)
+    articles = soup.find_all('article', itemtype="http://schema.org/BlogPosting")
+    return [article.find('h1', class_='entry-title').find('a')['href'] for article in articles]
+
+def discover_last_page(html, base_url=BASE_URL):
+    # 목록 페이지의 페이지네이션 링크 중 같은 카테고리의 가장 큰 페이지 번호를 반환
+    # 링크가 '다음'만 있는 형태여도, 페이지를 넘길 때마다 다시 호출하면 끝까지 따라감
+    prefix = unquote(urlsplit(base_url.format(1)).path).split('/page/')[0]
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('a', href=True))
+    last_page = 1
+    for link in soup.find_all('a', href=True):
+        path = unquote(urlsplit(link['href']).path)
+        match = PAGE_LINK.search(path)
+        if match and path.startswith(prefix + '/page/'):
+            last_page = max(last_page, int(match.group(1)))
+    return last_page
+
+def split_known(urls, known_urls):
+    # (새 URL 목록, 이미 가진 글을 만났는지 여부)
+    if known_urls is None:
+        return urls, False
+    new_urls = [url for url in urls if url not in known_urls]
+    return new_urls, len(new_urls) < len(urls)
+
+def parse_article(html, mode=DEFAULT_PARSE_MODE):
+    # 모든 모드에서 같은 선택자(h1.entry-title, div.entry-content)를 사용
+    soup = make_soup(html, mode, ARTICLE_STRAINER)
+
     title = soup.find('h1', class_='entry-title').text.strip()
     content = soup.find('div', class_='entry-content').text.strip()
-    
+
     # 전처리 적용
     title = preprocess_text(title)
     content = preprocess_text(content)
-    
+
     return title, content
 
-def crawl_debate_site():
-    base_url = "http://www.realdebate.co.kr/category/%ed%86%a0%eb%a1%a0%ec%9e%90%eb%a3%8c%ec%8b%a4/%ed%86%a0%eb%a1%a0%ea%b5%90%ec%9c%a1/page/{}/"
-    
+# 캐시에 반영할 상태 코드 (오류 응답은 캐시하지 않음)
+CACHEABLE_STATUSES = {200, 304}
+
+def polite_get(session, scheduler, url, headers=None):
+    # 스케줄러가 정한 간격만큼 기다린 뒤 요청하고, 응답 결과를 스케줄러에 반영
+    # MAX_ATTEMPTS번 모두 429/5xx이거나 다른 오류 응답(4xx)이면 requests.HTTPError
+    for _ in range(MAX_ATTEMPTS):
+        scheduler.wait(url)
+        start = time.monotonic()
+        response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        scheduler.record(url, response.status_code, time.monotonic() - start,
+                         parse_retry_after(response.headers.get('Retry-After')))
+        if response.status_code not in THROTTLE_STATUSES:
+            break
+    response.raise_for_status()
+    return response
+
+def fetch_page(session, scheduler, url, cache=None, defer=False):
+    # (본문, 변경 여부)를 반환. 캐시가 있으면 조건부 요청으로 바뀌지 않은 페이지를 판별
+    # defer=True(글 페이지)면 바뀐 페이지의 캐시 항목은 글을 저장한 뒤 cache.commit(url)으로 기록
+    headers = cache.conditional_headers(url) if cache else None
+    response = polite_get(session, scheduler, url, headers)
+    if cache is None or response.status_code not in CACHEABLE_STATUSES:
+        return response.text, True
+    return cache.update(url, response.status_code, response.headers, response.text, defer)
+
+def load_robots(session, scheduler, url):
+    try:
+        response = session.get(scheduler.robots_url(url), timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"robots.txt를 가져오지 못했습니다: {e}")
+        return
+    if response.status_code == 200:
+        scheduler.configure_from_robots(url, response.text)
+
+def get_article_content(url, session=None, scheduler=None):
+    if scheduler is not None:
+        response = polite_get(session or requests, scheduler, url)
+    else:
+        response = (session or requests).get(url)
+    return parse_article(response.text)
+
+def crawl_debate_site(scheduler=None, cache=None, sink=None, parse_mode=DEFAULT_PARSE_MODE, known_urls=None,
+                      base_url=BASE_URL):
+    # cache를 넘기면 새로 추가되었거나 바뀐 글만 반환 (merge_articles로 기존 코퍼스에 병합)
+    # sink를 넘기면 글을 메모리에 모으지 않고 파싱 즉시 sink에 기록 (반환값은 빈 리스트)
+    # sink 없이 cache를 넘겼다면 반환된 글을 저장한 뒤 cache.commit_all()을 호출해야 다음 실행에서 건너뜀
+    # known_urls를 넘기면 이미 가진 글은 건너뛰고, 목록에서 이미 가진 글을 만나면 그 페이지까지만 크롤링
     all_articles = []
-    
-    for page in range(1, 12):  # 1부터 11페이지까지
-        url = base_url.format(page)
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        articles = soup.find_all('article', itemtype="http://schema.org/BlogPosting")
-        
-        for article in articles:
-            article_url = article.find('h1', class_='entry-title').find('a')['href']
-            title, content = get_article_content(article_url)
-            
-            all_articles.append({
-                'title': title,
-                'content': content,
-                'url': article_url
-            })
-        
-        print(f"Processed page {page}")
-        time.sleep(1)  # 웹사이트에 부담을 주지 않기 위해 1초 대기
-    
+    # 고정 1초 대기 대신 호스트 상태에 맞춰 요청 간격을 조절
+    scheduler = scheduler or PolitenessScheduler()
+
+    # 같은 호스트에 반복 요청하므로 연결을 재사용
+    with requests.Session() as session:
+        load_robots(session, scheduler, base_url)
+
+        page, last_page = 1, 1
+        while page <= last_page:
+            url = base_url.format(page)
+            try:
+                listing_html, _ = fetch_page(session, scheduler, url, cache)
+            except requests.RequestException as e:
+                print(f"Failed to fetch page {page}: {e}")
+                break
+            last_page = max(last_page, discover_last_page(listing_html, base_url))
+
+            urls = parse_listing(listing_html, parse_mode)
+            article_urls, reached_known = split_known(urls, known_urls)
+            for article_url in article_urls:
+                if sink is not None and article_url in sink.seen:
+                    continue
+                # 받지 못했거나 파싱하지 못한 글은 건너뜀 (캐시에도 기록되지 않으므로 다음 실행에서 다시 시도)
+                try:
+                    html, changed = fetch_page(session, scheduler, article_url, cache, defer=True)
+                except requests.RequestException as e:
+                    print(f"Failed to fetch {article_url}: {e}")
+                    continue
+                if not changed:
+                    continue
+                try:
+                    title, content = parse_article(html, parse_mode)
+                except Exception as e:
+                    print(f"Failed to parse {article_url}: {e}")
+                    continue
+
+                article = {
+                    'title': title,
+                    'content': content,
+                    'url': article_url
+                }
+                if sink is not None:
+                    sink.write(article)
+                    if cache is not None:
+                        cache.commit(article_url)
+                else:
+                    all_articles.append(article)
+
+            print(f"Processed page {page}/{last_page} ({scheduler.rate(url):.2f} req/s)")
+            if reached_known or not urls:
+                # 이미 가진 글에 도달했거나, 글이 없는 페이지(사이트가 줄어든 경우)면 중단
+                break
+            page += 1
+
     return all_articles
 
+class HostLimiter:
+    # 호스트별 세마포어로 동시 요청 수를 제한
+    def __init__(self, max_per_host=DEFAULT_MAX_PER_HOST):
+        self.max_per_host = max_per_host
+        self._semaphores = {}
+
+    def __call__(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self._semaphores[host]
+
+async def fetch_page_async(client, limiter, scheduler, url, cache=None, defer=False):
+    # fetch_page의 비동기 버전 (defer도 같은 의미)
+    headers = cache.conditional_headers(url) if cache else None
+    async with limiter(url):
+        for _ in range(MAX_ATTEMPTS):
+            await scheduler.wait_async(url)
+            start = time.monotonic()
+            response = await client.get(url, headers=headers)
+            scheduler.record(url, response.status_code, time.monotonic() - start,
+                             parse_retry_after(response.headers.get('Retry-After')))
+            if response.status_code not in THROTTLE_STATUSES:
+                break
+    # httpx는 304도 raise_for_status()에서 예외로 처리하므로 조건부 요청의 304는 제외
+    if response.status_code != 304:
+        response.raise_for_status()
+    if cache is None:
+        return response.text, True
+    return cache.update(url, response.status_code, response.headers, response.text, defer)
+
+async def load_robots_async(client, scheduler, url):
+    try:
+        response = await client.get(scheduler.robots_url(url))
+    except httpx.HTTPError as e:
+        print(f"robots.txt를 가져오지 못했습니다: {e}")
+        return
+    if response.status_code == 200:
+        scheduler.configure_from_robots(url, response.text)
+
+async def iter_listing_pages_async(client, limiter, scheduler, cache=None, known_urls=None,
+                                   parse_mode=DEFAULT_PARSE_MODE, parse=None, window=None, base_url=BASE_URL):
+    # 목록 페이지를 찾아가며 (페이지 번호, 새 글 URL 목록)을 차례로 반환
+    # 1페이지에서 마지막 페이지 번호를 찾은 뒤 나머지 페이지는 동시에 가져옴
+    # known_urls가 있으면 이미 가진 글에 도달했을 때 멈출 수 있도록 window 단위로 나눠서 가져옴
+    # parse: 목록 HTML을 받아 URL 목록을 돌려주는 코루틴 함수 (기본: 현재 스레드에서 parse_listing)
+    async def fetch_listing(page):
+        try:
+            html, _ = await fetch_page_async(client, limiter, scheduler, base_url.format(page), cache)
+            return html
+        except httpx.HTTPError as e:
+            print(f"Failed to fetch page {page}: {e}")
+            return None
+
+    async def parse_in_thread(html):
+        return parse_listing(html, parse_mode)
+
+    parse = parse or parse_in_thread
+    window = window or (limiter.max_per_host if known_urls is not None else None)
+    next_page, last_page = 1, 1
+    while next_page <= last_page:
+        pages = list(range(next_page, last_page + 1))[:window]
+        listings = await asyncio.gather(*(fetch_listing(page) for page in pages))
+
+        stop = False
+        for page, html in zip(pages, listings):
+            if html is None:
+                stop = True
+                continue
+            last_page = max(last_page, discover_last_page(html, base_url))
+            urls = await parse(html)
+            article_urls, reached_known = split_known(urls, known_urls)
+            if reached_known or not urls:
+                stop = True
+            yield page, article_urls
+        if stop:
+            break
+        next_page = pages[-1] + 1
+
+async def _crawl_article(client, limiter, scheduler, article_url, cache=None, sink=None, parse_mode=DEFAULT_PARSE_MODE,
+                         failed=None):
+    # 재시도 후에도 받지 못한 글은 failed에 URL을 남기고 건너뜀 (이미 받은 다른 글은 그대로 반환)
+    try:
+        html, changed = await fetch_page_async(client, limiter, scheduler, article_url, cache, defer=True)
+    except httpx.HTTPError as e:
+        print(f"Failed to fetch {article_url}: {e}")
+        if failed is not None:
+            failed.append(article_url)
+        return None
+    if not changed:
+        return None
+    title, content = parse_article(html, parse_mode)
+    article = {
+        'title': title,
+        'content': content,
+        'url': article_url
+    }
+    if sink is not None:
+        # 완료되는 순서대로 바로 기록
+        sink.write(article)
+        if cache is not None:
+            cache.commit(article_url)
+        return None
+    return article
+
+async def crawl_debate_site_async(max_per_host=DEFAULT_MAX_PER_HOST, timeout=REQUEST_TIMEOUT,
+                                  scheduler=None, cache=None, sink=None, parse_mode=DEFAULT_PARSE_MODE,
+                                  known_urls=None, base_url=BASE_URL):
+    # 하나의 keep-alive 커넥션 풀을 공유하면서 목록/본문 페이지를 동시에 가져옴
+    # 동시 요청 수는 limiter가, 요청 간격은 scheduler가 제한
+    limits = httpx.Limits(max_connections=max_per_host, max_keepalive_connections=max_per_host)
+    limiter = HostLimiter(max_per_host)
+    scheduler = scheduler or PolitenessScheduler()
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout, follow_redirects=True) as client:
+        await load_robots_async(client, scheduler, base_url)
+
+        article_urls = []
+        async for page, urls in iter_listing_pages_async(client, limiter, scheduler, cache, known_urls, parse_mode,
+                                                         base_url=base_url):
+            article_urls.extend(url for url in urls if sink is None or url not in sink.seen)
+            print(f"Processed page {page}")
+
+        # gather는 입력 순서를 유지하므로 결과 순서는 동기 크롤러와 동일
+        failed = []
+        articles = await asyncio.gather(*(_crawl_article(client, limiter, scheduler, url, cache, sink, parse_mode, failed)
+                                          for url in article_urls))
+
+    if failed:
+        print(f"Failed articles: {len(failed)}")
+    print(f"Crawl rate: {scheduler.stats()}")
+    return [article for article in articles if article is not None]
+
 if __name__ == "__main__":
-    articles = crawl_debate_site()
-    
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--async', dest='use_async', action='store_true', help='비동기 모드로 크롤링')
+    parser.add_argument('--pipeline', action='store_true', help='fetch/파싱/저장을 분리한 파이프라인으로 크롤링')
+    parser.add_argument('--fetchers', type=int, default=8, help='파이프라인의 비동기 fetcher 수')
+    parser.add_argument('--parse-workers', type=int, default=None, help='파이프라인의 파싱 프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--max-per-host', type=int, default=DEFAULT_MAX_PER_HOST, help='호스트당 최대 동시 요청 수')
+    parser.add_argument('--incremental', action='store_true', help='HTTP 캐시를 사용해 새 글/바뀐 글만 병합')
+    parser.add_argument('--stop-at-known', action='store_true',
+                        help='crawled_articles.json에 이미 있는 글에 도달하면 목록 탐색을 멈추고 새 글만 병합')
+    parser.add_argument('--parse-mode', choices=PARSE_MODES, default=DEFAULT_PARSE_MODE, help='HTML 파싱 방식')
+    parser.add_argument('--jsonl', metavar='PATH', help='글을 파싱 즉시 JSONL 파일에 기록하고 마지막에 JSON으로 변환')
+    args = parser.parse_args()
+
+    cache = HttpCache() if args.incremental else None
+    known_urls = None
+    if args.stop_at_known and os.path.exists('crawled_articles.json'):
+        with open('crawled_articles.json', 'r', encoding='utf-8') as f:
+            known_urls = {article['url'] for article in json.load(f)}
+    merge = cache is not None or known_urls is not None
+    # 글 페이지의 캐시 항목은 글이 sink나 crawled_articles.json에 저장된 뒤에만 기록
+    sink = JsonlSink(args.jsonl) if args.jsonl else None
+    if sink is not None and sink.seen:
+        print(f"Resuming: {len(sink.seen)} articles already in '{args.jsonl}'")
+
+    try:
+        if args.pipeline:
+            from crawl_pipeline import crawl_debate_site_pipeline
+            articles = asyncio.run(crawl_debate_site_pipeline(fetchers=args.fetchers, parse_workers=args.parse_workers,
+                                                              max_per_host=args.max_per_host, cache=cache, sink=sink,
+                                                              parse_mode=args.parse_mode, known_urls=known_urls))
+        elif args.use_async:
+            articles = asyncio.run(crawl_debate_site_async(max_per_host=args.max_per_host, cache=cache, sink=sink,
+                                                           parse_mode=args.parse_mode, known_urls=known_urls))
+        else:
+            articles = crawl_debate_site(cache=cache, sink=sink, parse_mode=args.parse_mode, known_urls=known_urls)
+    finally:
+        if sink is not None:
+            sink.close()
+
+    if sink is not None:
+        # JSONL을 기존 crawled_articles.json 형식으로 압축 (incremental/stop-at-known이면 기존 코퍼스에 병합)
+        base = None
+        if merge and os.path.exists('crawled_articles.json'):
+            with open('crawled_articles.json', 'r', encoding='utf-8') as f:
+                base = json.load(f)
+        articles, added = compact_jsonl(args.jsonl, 'crawled_articles.json', base=base)
+        if cache is not None:
+            cache.commit_all()
+        print(f"Total articles: {len(articles)} ({sink.written} written this run, {added} new)")
+        print("Crawled data has been saved to 'crawled_articles.json'")
+        sys.exit(0)
+
     # 결과 출력 (예시)
     for i, article in enumerate(articles, 1):
         print(f"Article {i}:")
@@ -67,8 +389,20 @@ if __name__ == "__main__":
 
     print(f"Total articles crawled: {len(articles)}")
 
+    if merge:
+        try:
+            with open('crawled_articles.json', 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+        except FileNotFoundError:
+            existing = []
+        changed = len(articles)
+        articles, added = merge_articles(existing, articles)
+        print(f"Merged {changed} changed articles ({added} new)")
+
     # 크롤링한 데이터를 JSON 파일로 저장
     with open('crawled_articles.json', 'w', encoding='utf-8') as f:
         json.dump(articles, f, ensure_ascii=False, indent=2)
+    if cache is not None:
+        cache.commit_all()
 
-    print("Crawled data has been saved to 'crawled_articles.json'")
\ No newline at end of file
+    print("Crawled data has been saved to 'crawled_articles.json'")
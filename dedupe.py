@@ -0,0 +1,130 @@
+import argparse
+import json
+import zlib
+from collections import defaultdict
+
+from normalizer import normalize_text
+
+# 중복 판정 기본값
+SHINGLE_SIZE = 5        # 문자 n-gram 크기 (한국어는 단어보다 문자 단위가 안정적)
+NUM_BINS = 128          # MinHash 서명 길이
+BANDS = 16              # LSH 밴드 수 (BANDS * ROWS == NUM_BINS)
+ROWS = 8                # 밴드당 행 수, 후보가 되는 대략적인 유사도: (1/BANDS) ** (1/ROWS) ~= 0.71
+THRESHOLD = 0.8         # 후보 쌍을 중복으로 판정하는 Jaccard 유사도
+
+def shingles(text, size=SHINGLE_SIZE):
+    text = normalize_text(text).replace(' ', '')
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+def minhash(shingle_set, num_bins=NUM_BINS):
+    # One Permutation Hashing: 해시 하나로 값을 num_bins개 구간에 나눠 담고 구간별 최솟값을 서명으로 사용
+    # (해시 함수 num_bins개를 쓰는 일반 MinHash보다 문서당 비용이 num_bins배 적음)
+    signature = [None] * num_bins
+    for shingle in shingle_set:
+        h = zlib.crc32(shingle.encode('utf-8'))
+        index, value = h % num_bins, h // num_bins
+        current = signature[index]
+        if current is None or value < current:
+            signature[index] = value
+    # 빈 구간은 오른쪽으로 가장 가까운 채워진 구간 값으로 채움 (densification)
+    filled = [i for i, value in enumerate(signature) if value is not None]
+    if not filled:
+        return tuple(0 for _ in signature)
+    for i in range(num_bins):
+        if signature[i] is None:
+            j = next((k for k in filled if k > i), filled[0])
+            signature[i] = signature[j] + (j - i) % num_bins * 0x1000000
+    return tuple(signature)
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+class UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # 번호가 작은(먼저 나온) 글을 대표로 유지
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+def find_duplicates(articles, threshold=THRESHOLD, bands=BANDS, rows=ROWS):
+    # LSH 밴딩으로 후보 쌍만 비교하므로 전체 쌍 비교(O(n^2)) 없이 거의 선형으로 동작
+    # 반환값: {대표 글 인덱스: [(중복 글 인덱스, 유사도), ...]}
+    sets = [shingles(article['title'] + ' ' + article['content']) for article in articles]
+    signatures = [minhash(shingle_set, bands * rows) for shingle_set in sets]
+
+    buckets = defaultdict(list)
+    for index, signature in enumerate(signatures):
+        for band in range(bands):
+            buckets[(band, signature[band * rows:(band + 1) * rows])].append(index)
+
+    uf = UnionFind(len(articles))
+    checked = set()
+    for members in buckets.values():
+        for i, first in enumerate(members):
+            for other in members[i + 1:]:
+                # 이미 같은 묶음이거나 다른 밴드에서 비교한 쌍은 건너뜀
+                if (first, other) in checked or uf.find(first) == uf.find(other):
+                    continue
+                checked.add((first, other))
+                if jaccard(sets[first], sets[other]) >= threshold:
+                    uf.union(first, other)
+
+    clusters = defaultdict(list)
+    for index in range(len(articles)):
+        root = uf.find(index)
+        if root != index:
+            clusters[root].append((index, jaccard(sets[root], sets[index])))
+    return dict(clusters)
+
+def dedupe(articles, threshold=THRESHOLD):
+    # (중복을 제거한 글 목록, 제거 내역) — 각 묶음에서 가장 먼저 나온 글을 남김
+    clusters = find_duplicates(articles, threshold)
+    dropped = {index for members in clusters.values() for index, _ in members}
+    kept = [article for index, article in enumerate(articles) if index not in dropped]
+
+    def describe(index):
+        article = articles[index]
+        return {'index': index, 'id': article.get('id'), 'title': article['title'], 'url': article['url']}
+
+    report = [
+        {
+            'kept': describe(root),
+            'dropped': [dict(describe(index), similarity=round(score, 3)) for index, score in members],
+        }
+        for root, members in sorted(clusters.items())
+    ]
+    return kept, report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default='crawled_articles.json')
+    parser.add_argument('output', nargs='?', default='deduped_articles.json')
+    parser.add_argument('--report', default='dedupe_report.json', help='제거한 글 목록을 저장할 파일')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help='중복으로 판정할 Jaccard 유사도')
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        articles = json.load(f)
+
+    kept, report = dedupe(articles, args.threshold)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(kept, f, ensure_ascii=False, indent=2)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"Kept {len(kept)} of {len(articles)} articles, dropped {len(articles) - len(kept)} "
+          f"in {len(report)} clusters. Report saved to '{args.report}'")
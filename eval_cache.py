@@ -0,0 +1,107 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from atomic_json import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+# 같은 토론 기록에 대한 평가를 다시 요청하지 않도록 결과를 저장하는 캐시
+# - 키: (주제, 사용자 입장, 루브릭 버전, 평가 방식, 정규화한 대화 기록)의 SHA-256 — 내용이 같으면 같은 키
+#   (평가 방식마다 결과가 다르므로 전체 평가/기준별 병렬 평가/턴 평균은 서로 다른 항목)
+#   (대화 기록은 유니코드 NFC 정규화 + 연속 공백 정리만 함)
+# - 메모리: 최근에 쓴 max_entries개만 남기는 LRU
+# - 디스크(선택): cache_dir을 주면 키마다 JSON 파일 하나로 저장해 서버를 다시 띄워도 재사용
+# - 오류 결과는 저장하지 않음
+
+MAX_ENTRIES = 256
+CACHE_DIR = os.getenv('EVALUATION_CACHE_DIR') or None     # 지정하지 않으면 메모리에만 저장
+
+def normalize(text):
+    return ' '.join(unicodedata.normalize('NFC', text or '').split())
+
+def cache_key(topic, stance, rubric_version, mode, turns):
+    # turns: [(사용자 발언, AI 답변), ...]
+    payload = {
+        'topic': normalize(topic),
+        'stance': stance,
+        'rubric_version': rubric_version,
+        'mode': mode,
+        'turns': [[normalize(user), normalize(ai)] for user, ai in turns],
+    }
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+class EvaluationCache:
+    def __init__(self, max_entries=MAX_ENTRIES, cache_dir=CACHE_DIR):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def _remember(self, key, result):
+        # 잠금을 잡은 상태에서 호출
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        result = self._read(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, result)
+            return result
+
+    def put(self, key, result):
+        if not result or 'error' in result:
+            return
+        with self._lock:
+            self._remember(key, result)
+        if self.cache_dir:
+            write_json_atomic(result, self._path(key))
+
+    def _read(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries, 'hits': self.hits,
+                    'disk_hits': self.disk_hits, 'misses': self.misses, 'cache_dir': self.cache_dir}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_evaluation_cache():
+    # 프로세스 전체에서 하나의 평가 캐시를 공유
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EvaluationCache()
+    return _cache
@@ -0,0 +1,154 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 토론 평가 기준(루브릭)과 평가 결과
+# - 루브릭은 여기서 한 번만 정의하고, 모델에는 도구(tool) 입력 스키마로 넘겨 구조화된 출력으로 받음
+#   (중괄호를 겹쳐 쓰게 하고 문자열을 고쳐 파싱하던 방식 대신)
+# - 받은 입력은 validate()로 검사해 숫자 점수를 가진 EvaluationResult로 바꾸고, 총점은 여기서 직접 계산
+# - 기준별 병렬 평가: 네 기준을 같은 대화에 대한 작은 요청 네 개로 동시에 보내고 총점은 여기서 계산
+#   (전체 시간이 네 기준의 합이 아니라 가장 느린 기준 하나 정도)
+# - 턴 단위 평가: 사용자 발언 하나가 끝날 때마다(AI 답변 직후) 그 턴만 백그라운드에서 같은 루브릭으로 채점하고,
+#   토론 종료 시에는 aggregate()로 모으기만 하므로 종료 단계의 지연이 토론 길이와 무관함
+#
+# 화면에 넘기는 형식(EvaluationResult.to_dict())은 기존과 같음
+# {"주제의 일관성": {"점수": 0-25, "코멘트": ..., "개선을 위한 조언": ...}, ..., "총점": 0-100}
+
+RUBRIC_VERSION = 2
+CRITERIA = ['주제의 일관성', '논리적 연결성', '반박의 적절성', '근거의 타당성']
+CRITERIA_QUESTIONS = {
+    '주제의 일관성': "발언들이 주제에 부합하고 일관성이 있는가?",
+    '논리적 연결성': "발언들의 흐름과 논리적 연결성이 잘 유지되었는가?",
+    '반박의 적절성': "상대방의 주장을 이해하고 적절히 반박하였는가?",
+    '근거의 타당성': "주장에 대한 근거가 충분히 타당하고 논리적인가?",
+}
+MAX_SCORE = 25
+TOTAL_KEY = '총점'
+SCORE_KEY, COMMENT_KEY, ADVICE_KEY = '점수', '코멘트', '개선을 위한 조언'
+
+CRITERION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        SCORE_KEY: {"type": "integer", "minimum": 0, "maximum": MAX_SCORE},
+        COMMENT_KEY: {"type": "string", "description": "평가에 대한 간단한 코멘트"},
+        ADVICE_KEY: {"type": "string", "description": "사용자가 실제로 말한 문장을 인용하고 어떻게 바꾸면 더 나은지 설명"},
+    },
+    "required": [SCORE_KEY, COMMENT_KEY, ADVICE_KEY],
+}
+RUBRIC_SCHEMA = {
+    "type": "object",
+    "properties": {name: dict(CRITERION_SCHEMA, description=CRITERIA_QUESTIONS[name]) for name in CRITERIA},
+    "required": CRITERIA,
+}
+EVALUATION_TOOL = {
+    "name": "submit_evaluation",
+    "description": f"토론 평가 결과를 기준별로 제출합니다. 각 기준은 {MAX_SCORE}점 만점의 정수 점수입니다.",
+    "input_schema": RUBRIC_SCHEMA,
+}
+
+# 기준 하나만 평가할 때 쓰는 도구 (기준별 병렬 평가)
+CRITERION_TOOL = {
+    "name": "submit_criterion",
+    "description": f"토론 평가 기준 하나에 대한 결과를 제출합니다. 점수는 {MAX_SCORE}점 만점의 정수입니다.",
+    "input_schema": CRITERION_SCHEMA,
+}
+
+CRITERION_MAX_TOKENS = 800
+TURN_MODEL = "claude-3-5-sonnet-20240620"
+TURN_MAX_TOKENS = 600
+
+class RubricValidationError(ValueError):
+    pass
+
+class CriterionResult:
+    def __init__(self, score, comment, advice):
+        self.score = score          # 0-MAX_SCORE 정수
+        self.comment = comment
+        self.advice = advice
+
+    def to_dict(self):
+        return {SCORE_KEY: self.score, COMMENT_KEY: self.comment, ADVICE_KEY: self.advice}
+
+class EvaluationResult:
+    def __init__(self, criteria):
+        self.criteria = criteria    # 기준 이름 -> CriterionResult (CRITERIA 순서)
+
+    @property
+    def total(self):
+        return sum(result.score for result in self.criteria.values())
+
+    def to_dict(self):
+        result = {name: criterion.to_dict() for name, criterion in self.criteria.items()}
+        result[TOTAL_KEY] = self.total
+        return result
+
+def tool_request(model, max_tokens, prompt, tool=EVALUATION_TOOL):
+    # 루브릭 도구를 반드시 호출하게 하는 messages.create 인자
+    return dict(
+        model=model,
+        max_tokens=max_tokens,
+        tools=[tool],
+        tool_choice={"type": "tool", "name": tool['name']},
+        messages=[{"role": "user", "content": prompt}]
+    )
+
+def tool_input(response, tool=EVALUATION_TOOL):
+    # 응답에서 루브릭 도구 호출의 입력을 꺼냄
+    for block in response.content:
+        if block.type == "tool_use" and block.name == tool['name']:
+            return block.input
+    raise RubricValidationError("응답에 평가 도구 호출이 없습니다.")
+
+def validate_criterion(name, item):
+    if not isinstance(item, dict):
+        raise RubricValidationError(f"{name}: 객체가 아닙니다 ({item!r})")
+    try:
+        score = float(item[SCORE_KEY])
+    except (KeyError, TypeError, ValueError):
+        raise RubricValidationError(f"{name}: 숫자 점수가 없습니다 ({item.get(SCORE_KEY)!r})")
+    if not 0 <= score <= MAX_SCORE:
+        logger.warning(f"{name}: 점수 {score}가 0-{MAX_SCORE} 범위를 벗어나 잘라냄")
+    return CriterionResult(min(max(round(score), 0), MAX_SCORE),
+                           str(item.get(COMMENT_KEY, '')), str(item.get(ADVICE_KEY, '')))
+
+def validate(data):
+    # 도구 입력(dict) -> EvaluationResult, 기준이 빠졌거나 점수가 숫자가 아니면 RubricValidationError
+    if not isinstance(data, dict):
+        raise RubricValidationError(f"평가 결과가 객체가 아닙니다: {data!r}")
+    missing = [name for name in CRITERIA if name not in data]
+    if missing:
+        raise RubricValidationError(f"평가 기준이 빠졌습니다: {', '.join(missing)}")
+    return EvaluationResult({name: validate_criterion(name, data[name]) for name in CRITERIA})
+
+def error_result(error, raw=None):
+    return {"error": str(error), "raw_response": raw if isinstance(raw, str) else json.dumps(raw, ensure_ascii=False)}
+
+def turn_prompt(topic, user_stance, previous_ai, user, ai):
+    criteria = "\n".join(f"{i}. {name} : {CRITERIA_QUESTIONS[name]}" for i, name in enumerate(CRITERIA, 1))
+    return f"""당신은 토론대회의 심판자입니다. 주제는 "{topic}"이고 사용자는 {user_stance} 입장입니다.
+    다음은 토론 중 한 턴입니다.
+
+    직전 AI 발언: {previous_ai or "(없음, 토론의 첫 발언)"}
+    사용자 발언: {user}
+    이에 대한 AI 답변: {ai}
+
+    이 턴의 사용자 발언만 다음 기준에 따라 각각 {MAX_SCORE}점 만점으로 평가하세요:
+    {criteria}
+
+    개선을 위한 조언에는 사용자가 실제로 말한 문장을 인용하고 어떻게 바꾸면 더 좋은지 한 문장으로 적으세요.
+    결과는 {EVALUATION_TOOL['name']} 도구로 제출하세요."""
+
+def aggregate(turn_results):
+    # 턴별 EvaluationResult 목록 -> 전체 EvaluationResult
+    # 기준 점수는 턴 평균, 코멘트와 조언은 그 기준에서 가장 낮은 점수를 받은 턴의 것을 사용 (가장 개선할 점)
+    criteria = {}
+    for name in CRITERIA:
+        items = [result.criteria[name] for result in turn_results]
+        if not items:
+            criteria[name] = CriterionResult(0, "평가할 발언이 없습니다.", "")
+            continue
+        weakest = min(items, key=lambda item: item.score)
+        criteria[name] = CriterionResult(round(sum(item.score for item in items) / len(items)),
+                                         weakest.comment, weakest.advice)
+    return EvaluationResult(criteria)
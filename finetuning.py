@@ -1,10 +1,9 @@
-import json
+from corpus_store import open_corpus
 from transformers import AutoTokenizer, AutoModelForCausalLM, TrainingArguments, Trainer
 from datasets import Dataset
 
-# JSON 데이터 로드
-with open('crawled_articles.json', 'r', encoding='utf-8') as f:
-    articles = json.load(f)
+# 데이터 로드 (corpus_store.py로 변환해 두었으면 JSON 전체를 파싱하지 않고 mmap으로 읽음)
+articles = open_corpus('crawled_articles.json')
 
 # 데이터셋 준비
 texts = [f"토론 주제: {article['title']}\n내용: {article['content']}" for article in articles]
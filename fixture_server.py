@@ -0,0 +1,181 @@
+import argparse
+import hashlib
+import html
+import json
+import random
+import re
+import textwrap
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# realdebate.co.kr 구조(목록: article[itemtype=BlogPosting] > h1.entry-title > a, 본문: h1.entry-title, div.entry-content)를
+# 흉내 낸 HTML을 crawled_articles.json으로 만들어 로컬에서 제공하는 테스트용 서버
+# 지연 시간, 오류 비율, 페이지 수를 조절할 수 있어 네트워크 없이 크롤러 성능을 비교할 수 있음
+
+LISTING_PATH = re.compile(r'^/category/debate/page/(\d+)/?$')
+ARTICLE_PATH = re.compile(r'^/article/(\d+)/?$')
+ARTICLES_PER_PAGE = 10
+
+# 실제 페이지처럼 본문 외의 마크업(메뉴, 사이드바, 스크립트)을 붙여 파싱 부하를 비슷하게 맞춤
+_CHROME = ''.join(
+    f'<li class="menu-item"><a href="/menu/{i}/">메뉴 {i}</a></li>' for i in range(60)
+) + '<script>' + 'var x = 1;' * 200 + '</script>'
+
+def render_listing(origin, page, page_count, articles, start):
+    # 실제 사이트처럼 글/페이지 링크는 절대 URL로 제공
+    items = ''.join(
+        f'<article itemscope itemtype="http://schema.org/BlogPosting" class="post">'
+        f'<header><h1 class="entry-title"><a href="{origin}/article/{start + i}/">{html.escape(article["title"])}</a></h1></header>'
+        f'<div class="entry-summary"><p>{html.escape(article["content"][:200])}</p></div></article>'
+        for i, article in enumerate(articles)
+    )
+    links = ''.join(
+        f'<a class="page-numbers" href="{origin}/category/debate/page/{n}/">{n}</a>'
+        for n in range(max(1, page - 2), min(page_count, page + 2) + 1)
+    )
+    if page < page_count:
+        links += f'<a class="page-numbers" href="{origin}/category/debate/page/{page_count}/">{page_count}</a>'
+    return (f'<html><head><title>토론교육 - {page}</title></head><body><nav><ul>{_CHROME}</ul></nav>'
+            f'<main>{items}</main><div class="nav-links">{links}</div></body></html>')
+
+def render_article(article):
+    paragraphs = ''.join(f'<p>{html.escape(chunk)}.</p>' for chunk in textwrap.wrap(article['content'], 300))
+    return (f'<html><head><title>{html.escape(article["title"])}</title></head><body><nav><ul>{_CHROME}</ul></nav>'
+            f'<article><h1 class="entry-title">{html.escape(article["title"])}</h1>'
+            f'<div class="entry-content">{paragraphs}</div></article>'
+            f'<aside><h3 class="widget-title">최근 글</h3>{_CHROME}</aside></body></html>')
+
+class FixtureServer:
+    # with FixtureServer(...) as server: 로 백그라운드 스레드에서 실행
+    # - latency: 응답 전 대기 시간(초), jitter: 대기 시간에 더할 무작위 범위(초)
+    # - error_rate: 503(Retry-After: 0)으로 응답할 확률
+    # - pages: 목록 페이지 수 (글이 모자라면 코퍼스를 반복해서 채움)
+    def __init__(self, corpus_path='crawled_articles.json', pages=11, latency=0.0, jitter=0.0,
+                 error_rate=0.0, crawl_delay=None, host='127.0.0.1', port=0, seed=0):
+        with open(corpus_path, 'r', encoding='utf-8') as f:
+            corpus = json.load(f)
+        count = pages * ARTICLES_PER_PAGE
+        self.articles = [corpus[i % len(corpus)] for i in range(count)]
+        self.pages = pages
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.crawl_delay = crawl_delay
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def origin(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self):
+        return self.origin + "/category/debate/page/{}/"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _route(self, path):
+        # (상태 코드, 본문)
+        if path == '/robots.txt':
+            body = 'User-agent: *\nDisallow: /wp-admin/\n'
+            if self.crawl_delay is not None:
+                body += f'Crawl-delay: {self.crawl_delay}\n'
+            return 200, body
+        match = LISTING_PATH.match(path)
+        if match and 1 <= int(match.group(1)) <= self.pages:
+            page = int(match.group(1))
+            start = (page - 1) * ARTICLES_PER_PAGE
+            return 200, render_listing(self.origin, page, self.pages, self.articles[start:start + ARTICLES_PER_PAGE], start)
+        match = ARTICLE_PATH.match(path)
+        if match and int(match.group(1)) < len(self.articles):
+            return 200, render_article(self.articles[int(match.group(1))])
+        return 404, '<html><body>Not Found</body></html>'
+
+    def handle(self, request):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            failed = self.random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+
+        if failed:
+            with self._lock:
+                self.errors += 1
+            request.send_response(503)
+            request.send_header('Retry-After', '0')
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            return
+
+        status, body = self._route(request.path)
+        data = body.encode('utf-8')
+        etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+        if status == 200 and request.headers.get('If-None-Match') == etag:
+            request.send_response(304)
+            request.send_header('ETag', etag)
+            request.end_headers()
+            return
+
+        request.send_response(status)
+        request.send_header('Content-Type', 'text/html; charset=utf-8' if request.path != '/robots.txt' else 'text/plain')
+        request.send_header('Content-Length', str(len(data)))
+        if status == 200:
+            request.send_header('ETag', etag)
+        request.end_headers()
+        request.wfile.write(data)
+        with self._lock:
+            self.bytes_sent += len(data)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--pages', type=int, default=11)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FixtureServer(pages=args.pages, latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, port=args.port)
+    print(f"Serving {args.pages} listing pages at {server.base_url.format(1)} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
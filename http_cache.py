@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+
+from atomic_json import write_json_atomic
+
+DEFAULT_CACHE_DIR = '.http_cache'
+
+def _digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class HttpCache:
+    # URL별 응답 본문과 ETag/Last-Modified를 디스크에 저장하는 캐시
+    # 다음 요청 때 조건부 요청 헤더를 만들어 바뀌지 않은 페이지는 304로 건너뜀
+    # 글 페이지는 update(defer=True)로 받아 두고, 글을 sink나 JSON에 저장한 뒤 commit()해야 캐시에 기록됨
+    # (저장 전에 중단되거나 파싱에 실패한 페이지는 다음 실행에서 다시 받아 처리)
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._pending = {}      # URL -> 아직 기록하지 않은 캐시 항목
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url):
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def conditional_headers(self, url):
+        entry = self.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def update(self, url, status, headers, body, defer=False):
+        # 응답을 캐시에 반영하고 (본문, 변경 여부)를 반환
+        # 304이거나 본문 해시가 같으면 변경되지 않은 것으로 판단
+        # defer=True면 바뀐 페이지는 바로 기록하지 않고 commit(url)을 기다림
+        entry = self.get(url)
+        if status == 304 and entry is not None:
+            self.hits += 1
+            return entry['body'], False
+
+        digest = _digest(body)
+        changed = entry is None or entry.get('sha256') != digest
+        if changed:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        entry = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'sha256': digest,
+            'body': body,
+        }
+        if changed and defer:
+            self._pending[url] = entry
+        else:
+            self._write(url, entry)
+        return body, changed
+
+    def commit(self, url):
+        # url의 글을 저장한 뒤 호출: 보류 중인 캐시 항목을 기록
+        entry = self._pending.pop(url, None)
+        if entry is not None:
+            self._write(url, entry)
+
+    def commit_all(self):
+        # 반환받은 글 목록을 JSON으로 저장한 뒤 호출
+        for url in list(self._pending):
+            self.commit(url)
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def _write(self, url, entry):
+        write_json_atomic(entry, self._path(url))
+
+def merge_articles(existing, updated):
+    # URL 기준으로 새 글은 추가하고 바뀐 글은 교체 (기존 순서와 id 등 추가 필드는 유지)
+    merged = [dict(article) for article in existing]
+    index = {article['url']: i for i, article in enumerate(merged)}
+    added = 0
+    for article in updated:
+        if article['url'] in index:
+            merged[index[article['url']]].update(article)
+        else:
+            index[article['url']] = len(merged)
+            merged.append(dict(article))
+            added += 1
+    return merged, added
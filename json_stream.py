@@ -0,0 +1,126 @@
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# 스트리밍으로 받는 도구 입력(input_json_delta)에서 최상위 JSON 객체의 항목을 하나씩 꺼내는 점진적 파서
+# - feed()로 받은 조각을 넣으면, 값이 끝난 최상위 항목을 (키, 값) 목록으로 바로 돌려줌
+#   (값이 객체/배열이면 닫히는 순간, 숫자/문자열 등이면 뒤의 ',' 또는 '}'를 만나는 순간)
+# - 도구 입력은 스키마를 따르는 JSON이지만, 스트림이 중간에 끊기거나 값 하나가 스키마를 벗어나도
+#   받은 항목까지는 화면에 보여 줄 수 있도록 다음을 허용함
+#   - 객체 앞의 다른 문자, 닫는 괄호 앞의 쉼표, 따옴표 없는 단순 값
+#   - 값 하나가 깨지면 그 항목만 건너뛰고 나머지 항목은 계속 꺼냄
+
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+class JsonObjectStream:
+    def __init__(self):
+        self.result = {}
+        self._buffer = ""
+        self._pos = 0
+        self._clean = []            # 형식 오류를 고친 뒤의 문자들
+        self._stack = []            # 열린 괄호들
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._key = None
+        self._key_start = None
+        self._awaiting_value = False
+        self._value_start = None
+
+    def feed(self, text):
+        self._buffer += text
+        return self._scan()
+
+    def close(self):
+        # 스트림이 끝났을 때 호출: 닫히지 않은 객체 안의 마지막 단순 값도 내보냄
+        members = []
+        if not self._done and len(self._stack) == 1 and self._value_start is not None and not self._in_string:
+            members.extend(self._emit(self._value_start))
+        return members
+
+    def _emit(self, start, end=None):
+        key = self._key
+        text = ''.join(self._clean[start:end]).strip()
+        self._key = self._key_start = self._value_start = None
+        self._awaiting_value = False
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                value = json.loads(_TRAILING_COMMA.sub(r'\1', text))
+            except json.JSONDecodeError:
+                if text[:1] in '{["':
+                    logger.warning(f"JSON 항목을 해석하지 못해 건너뜀: {key}: {text[:100]}")
+                    return []
+                value = text    # 따옴표 없는 단순 값은 문자열로 받아들임
+        self.result[key] = value
+        return [(key, value)]
+
+    def _scan(self):
+        members = []
+        buffer = self._buffer
+        while self._pos < len(buffer) and not self._done:
+            c = buffer[self._pos]
+
+            if not self._started:
+                if c == '{':
+                    self._stack.append(c)
+                    self._clean.append(c)
+                    self._started = True
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if c == '"' and not self._escape:
+                    self._clean.append(c)
+                    self._close_string()
+                else:
+                    self._clean.append(c)
+                    self._escape = not self._escape and c == '\\'
+                self._pos += 1
+                continue
+
+            depth = len(self._stack)
+            if depth == 1 and self._awaiting_value and not c.isspace() and c not in ',}':
+                self._value_start = len(self._clean)
+                self._awaiting_value = False
+
+            if c == '"':
+                if depth == 1 and self._key is None and self._value_start is None:
+                    self._key_start = len(self._clean)
+                self._in_string = True
+                self._clean.append(c)
+            elif c in '{[':
+                self._stack.append(c)
+                self._clean.append(c)
+            elif c in '}]':
+                if depth == 1 and self._value_start is not None:
+                    members.extend(self._emit(self._value_start))
+                self._stack.pop()
+                self._clean.append(c)
+                if len(self._stack) == 1 and self._value_start is not None:
+                    members.extend(self._emit(self._value_start))
+                elif not self._stack:
+                    self._done = True
+            elif c == ',' and depth == 1:
+                if self._value_start is not None:
+                    members.extend(self._emit(self._value_start))
+                self._clean.append(c)
+            elif c == ':' and depth == 1 and self._key is not None:
+                self._awaiting_value = True
+                self._clean.append(c)
+            else:
+                self._clean.append(c)
+            self._pos += 1
+        return members
+
+    def _close_string(self):
+        self._in_string = False
+        if self._key_start is not None and self._key is None:
+            try:
+                self._key = json.loads(''.join(self._clean[self._key_start:]))
+            except json.JSONDecodeError:
+                self._key = ''.join(self._clean[self._key_start + 1:-1])
@@ -0,0 +1,73 @@
+import logging
+import os
+import threading
+
+import httpx
+from anthropic import Anthropic, AsyncAnthropic, DefaultAsyncHttpxClient, DefaultHttpxClient
+
+logger = logging.getLogger(__name__)
+
+# 프로세스 전체가 공유하는 Anthropic 클라이언트 모음
+# - 세션마다 클라이언트를 만들면 연결 풀, TLS 핸드셰이크, 메모리가 세션 수만큼 늘어나므로
+#   API 키별로 동기/비동기 클라이언트를 하나씩만 만들고 keep-alive 연결을 재사용함
+# - 연결 수에 상한을 두어 동시 접속자가 많아도 연결이 무한히 늘지 않음 (상한을 넘는 요청은 풀에서 대기)
+# - 재시도는 resilience 계층이 맡으므로 SDK 자체 재시도는 끔 (max_retries=0)
+# - pool_stats()로 풀 사용 현황(열린 연결, 사용 중, 유휴, 대기 중인 요청)을 볼 수 있음
+
+MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', 64))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('LLM_MAX_KEEPALIVE_CONNECTIONS', 16))
+KEEPALIVE_EXPIRY = float(os.getenv('LLM_KEEPALIVE_EXPIRY', 60.0))
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def pool_limits():
+    return httpx.Limits(max_connections=MAX_CONNECTIONS,
+                        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=KEEPALIVE_EXPIRY)
+
+def _get(kind, api_key):
+    key = (kind, api_key)
+    if key not in _clients:
+        with _clients_lock:
+            if key not in _clients:
+                if kind == 'async':
+                    client = AsyncAnthropic(api_key=api_key, max_retries=0, http_client=DefaultAsyncHttpxClient(limits=pool_limits()))
+                else:
+                    client = Anthropic(api_key=api_key, max_retries=0, http_client=DefaultHttpxClient(limits=pool_limits()))
+                _clients[key] = client
+                logger.info(f"LLM 클라이언트 생성 ({kind}, 최대 연결 {MAX_CONNECTIONS}, keep-alive {MAX_KEEPALIVE_CONNECTIONS})")
+    return _clients[key]
+
+def get_client(api_key):
+    return _get('sync', api_key)
+
+def get_async_client(api_key):
+    # 비동기 클라이언트는 async_runtime의 공유 이벤트 루프에서만 사용
+    return _get('async', api_key)
+
+def _pool_of(client):
+    # anthropic 클라이언트 -> httpx 클라이언트 -> 전송 계층 -> httpcore 연결 풀
+    transport = getattr(client._client, '_transport', None)
+    return getattr(transport, '_pool', None)
+
+def pool_stats():
+    # 클라이언트별 연결 풀 사용 현황
+    stats = []
+    for (kind, _), client in list(_clients.items()):
+        pool = _pool_of(client)
+        if pool is None:
+            continue
+        connections = list(pool.connections)
+        requests = list(getattr(pool, '_requests', []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        stats.append({
+            'kind': kind,
+            'max_connections': MAX_CONNECTIONS,
+            'open': len(connections),
+            'active': len(connections) - idle,
+            'idle': idle,
+            'waiting': sum(1 for request in requests if request.is_queued()),
+            'utilization': round((len(connections) - idle) / MAX_CONNECTIONS, 3),
+        })
+    return stats
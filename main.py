@@ -1,9 +1,17 @@
-import json
-from anthropic import Anthropic
+import asyncio
 import logging
 import os
 from dotenv import load_dotenv
 import streamlit as st
+from retrieval import get_index
+from catalog import get_catalog
+from llm_clients import get_async_client, get_client
+from resilience import llm_guard
+import async_runtime
+import evaluation
+from eval_cache import cache_key, get_evaluation_cache
+from json_stream import JsonObjectStream
+from context_window import ContextWindow, KEEP_TURNS, TOKEN_BUDGET
 
 # .env 파일 로드
 load_dotenv()
@@ -12,9 +20,30 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 시스템 프롬프트 중 (캐릭터, 주제, AI 입장)마다 고정인 부분은 한 번만 만들어 모든 세션이 공유
+# 키에 카탈로그 스냅샷의 파일 시그니처를 넣어, 주제/캐릭터 파일이 바뀌어 다시 읽히면 새 프롬프트를 만듦
+# 이 부분에 cache_control을 붙여 두면 같은 토론의 다음 턴부터는 Anthropic 프롬프트 캐시에서 읽힘
+# (모델별 최소 캐시 길이보다 짧으면 캐시되지 않고 평소처럼 처리됨)
+_system_prompts = {}
+
+def usage_report(usage):
+    # 응답의 usage -> 캐시 생성/캐시 읽기/캐시 안 된 입력 토큰과 출력 토큰
+    return {
+        'input_tokens': usage.input_tokens,
+        'cache_creation_input_tokens': getattr(usage, 'cache_creation_input_tokens', None) or 0,
+        'cache_read_input_tokens': getattr(usage, 'cache_read_input_tokens', None) or 0,
+        'output_tokens': getattr(usage, 'output_tokens', None) or 0,
+    }
+
 class DebateBot:
-    def __init__(self, api_key):
-        self.client = Anthropic(api_key=api_key)
+    def __init__(self, api_key, keep_turns=KEEP_TURNS, token_budget=TOKEN_BUDGET, turn_scoring=True):
+        # 클라이언트와 연결 풀은 프로세스 전체에서 공유 (llm_clients)
+        self.client = get_client(api_key)
+        self.async_client = get_async_client(api_key)    # achat_stream/aevaluate_debate/대화 요약용 (공유 이벤트 루프에서만 사용)
+        # 최근 keep_turns턴만 그대로 보내고 나머지는 요약, 요청마다 대화 기록을 token_budget 이내로 유지
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+        self.context = ContextWindow(self.async_client, keep_turns, token_budget)
         self.messages = []
         self.chat_history = []  # 전체 채팅 히스토리를 저장할 리스트
         self.load_data()
@@ -32,29 +61,54 @@ class DebateBot:
         """
 
         self.evaluation_result = ''
+        self.evaluation = None  # 마지막 평가의 EvaluationResult (evaluation_result는 화면용 dict)
+        self.evaluation_cache = get_evaluation_cache()  # 같은 대화 기록의 평가 결과 (프로세스 전체 공유)
+        self.system_prompt = None
+        self.turn_usage = []    # 턴마다 usage_report() 결과
+        self.debate_turns = []  # (사용자 발언, AI 답변)
+        self.turn_scores = {}   # 턴 번호 -> EvaluationResult (백그라운드 턴 평가 결과)
+        self.turn_jobs = {}     # 턴 번호 -> 진행 중인 턴 평가 (concurrent.futures.Future)
+        self.turn_scoring = turn_scoring    # 턴마다 백그라운드 채점 여부 (턴 단위 평가를 쓸 때만 켬)
+
+        # 토론 교육 자료 검색용 색인 (프로세스 전체에서 공유, 자료가 없으면 None)
+        # RETRIEVAL_INDEX=tfidf로 TF-IDF 색인을 사용할 수 있음 (기본값 bm25)
+        self.retriever = get_index(os.getenv('RETRIEVAL_INDEX', 'bm25'))
 
     def load_data(self):
-        try:
-            with open('debate_topics.json', 'r', encoding='utf-8') as f:
-                self.debate_topics = json.load(f)
-            with open('characters.json', 'r', encoding='utf-8') as f:
-                self.debate_characters = json.load(f)
-        except FileNotFoundError as e:
-            logger.error(f"파일을 찾을 수 없습니다: {e}")
-            raise
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON 파일 파싱 오류: {e}")
-            raise
+        # 주제/캐릭터는 프로세스 전체가 공유하는 카탈로그에서 가져옴 (파일은 처음과 바뀌었을 때만 읽음)
+        self.catalog = get_catalog()
+
+    @property
+    def debate_topics(self):
+        return self.catalog.topics
+
+    @property
+    def debate_characters(self):
+        return self.catalog.characters
 
     def start_debate(self, selected_char, selected_topic, user_stance):
         try:
-            self.selected_char = next(char for char in self.debate_characters['characters'] if char['char_type'] == selected_char)
-            self.selected_topic = next(topic for topic in self.debate_topics if topic['keyword'] == selected_topic)
+            # 캐릭터, 주제, 프롬프트 키가 같은 시점의 파일 내용을 가리키도록 스냅샷 하나에서 조회
+            snapshot = self.catalog.snapshot
+            self.selected_char = snapshot.character_by_type[selected_char]
+            self.selected_topic = snapshot.topic_by_keyword[selected_topic]
             self.user_stance = user_stance
             self.ai_stance = "반대" if user_stance == "찬성" else "찬성"
             self.messages = []  # Reset messages for new debate
             self.chat_history = []  # Reset chat history for new debate
-        except StopIteration:
+            self.turn_usage = []
+            self.debate_turns = []
+            # 이전 토론의 턴 평가가 새 토론의 결과를 덮어쓰지 않도록 취소하고 새 dict로 교체
+            for job in list(self.turn_jobs.values()):
+                job.cancel()
+            self.turn_scores = {}
+            self.turn_jobs = {}
+            self.context = ContextWindow(self.async_client, self.keep_turns, self.token_budget)
+            key = (snapshot.signatures, self.selected_char['char_type'], self.selected_topic['keyword'], self.ai_stance)
+            if key not in _system_prompts:
+                _system_prompts[key] = self.generate_initial_prompt()
+            self.system_prompt = _system_prompts[key]
+        except KeyError:
             logger.error(f"선택한 캐릭터 또는 토픽을 찾을 수 없습니다: {selected_char}, {selected_topic}")
             raise ValueError("Invalid character or topic selection")
 
@@ -70,109 +124,362 @@ class DebateBot:
         다음을 인식하세요: {self.about_debate}
         다음 지침을 따르세요: {self.debate_template}"""
 
+    def find_evidence(self, user_input, top_k=3):
+        # 사용자 발언과 관련된 토론 교육 자료 문단을 찾아 시스템 프롬프트에 덧붙일 문자열로 만듦
+        if self.retriever is None:
+            return ""
+        results = self.retriever.search(user_input, top_k)
+        if not results:
+            return ""
+        passages = "\n".join(f"- [{passage['title']}] {passage['text']}" for _, passage in results)
+        return f"""
+        다음은 사용자의 이번 발언과 관련된 토론 교육 자료입니다. 반박과 근거 제시에 도움이 되면 참고하세요:
+        {passages}"""
+
+    def build_system(self, user_input, summary=""):
+        # 고정 프롬프트(캐시 대상) 뒤에 턴마다 바뀌는 대화 요약과 근거 자료를 별도 블록으로 붙임
+        system = [{"type": "text", "text": self.system_prompt, "cache_control": {"type": "ephemeral"}}]
+        if summary:
+            system.append({"type": "text", "text": f"지금까지의 토론 요약: {summary}"})
+        evidence = self.find_evidence(user_input)
+        if evidence:
+            system.append({"type": "text", "text": evidence})
+        return system
+
+    def record_usage(self, usage):
+        report = usage_report(usage)
+        self.turn_usage.append(report)
+        logger.info(f"턴 {len(self.turn_usage)} 입력 토큰: 캐시 읽기 {report['cache_read_input_tokens']}, "
+                    f"캐시 생성 {report['cache_creation_input_tokens']}, 캐시 안 됨 {report['input_tokens']} / "
+                    f"출력 {report['output_tokens']}")
+        return report
+
+    def chat_request(self, user_input):
+        # 이번 턴의 messages.create 인자 (동기/비동기 스트리밍이 같이 사용)
+        self.chat_history.append({"role": "user", "content": user_input})
+        summary, messages = self.context.build(user_input)
+        return dict(
+            model="claude-3-5-sonnet-20240620",
+            max_tokens=500,
+            messages=messages,
+            system=self.build_system(user_input, summary),
+            stream=True
+        )
+
+    def read_stream_event(self, chunk, turn):
+        # 스트림 이벤트 하나를 turn({'usage', 'text'})에 반영하고 새로 받은 텍스트를 반환
+        if chunk.type == "message_start":
+            turn['usage'] = chunk.message.usage
+        elif chunk.type == "message_delta" and turn['usage'] is not None:
+            turn['usage'].output_tokens = chunk.usage.output_tokens
+        elif chunk.type == "content_block_delta" and chunk.delta.text:
+            turn['text'] += chunk.delta.text
+            return chunk.delta.text
+        return ""
+
+    def finish_turn(self, user_input, turn):
+        if turn['usage'] is not None:
+            self.record_usage(turn['usage'])
+        self.chat_history.append({"role": "assistant", "content": turn['text']})
+        self.context.add_turn(user_input, turn['text'])
+        self.debate_turns.append((user_input, turn['text']))
+        if self.turn_scoring:
+            self.schedule_turn_scoring(len(self.debate_turns) - 1)
+
+    # LLM 호출은 모두 llm_guard(재시도 + 서킷 브레이커)를 거침
+    # 스트림은 연결(create)까지만 재시도하고, 텍스트를 보내기 시작한 뒤의 오류는 호출한 쪽으로 그대로 올림
+
     def chat_stream(self, user_input):
         try:
-            self.chat_history.append({"role": "user", "content": user_input})
-            
-            stream = self.client.messages.create(
-                model="claude-3-5-sonnet-20240620",
-                max_tokens=500,
-                messages=self.chat_history,
-                system=self.generate_initial_prompt(),
-                stream=True
-            )
+            stream = llm_guard.call(self.client.messages.create, name="대화 생성", **self.chat_request(user_input))
+        except Exception as e:
+            logger.error(f"채팅 생성 중 오류 발생: {e}")
+            raise
 
-            full_response = ""
+        turn = {'usage': None, 'text': ""}
+        try:
             for chunk in stream:
-                if chunk.type == "content_block_start":
-                    continue
-                if chunk.type == "content_block_delta":
-                    if chunk.delta.text:
-                        full_response += chunk.delta.text
-                        yield chunk.delta.text
                 if chunk.type == "message_stop":
                     break
+                text = self.read_stream_event(chunk, turn)
+                if text:
+                    yield text
+        except Exception as e:
+            llm_guard.stream_failed(e)
+            raise
+
+        self.finish_turn(user_input, turn)
 
-            self.chat_history.append({"role": "assistant", "content": full_response})
-        
+    async def achat_stream(self, user_input):
+        # chat_stream의 비동기 버전 (async_runtime의 공유 이벤트 루프에서 실행)
+        try:
+            stream = await llm_guard.acall(self.async_client.messages.create, name="대화 생성",
+                                           **self.chat_request(user_input))
         except Exception as e:
             logger.error(f"채팅 생성 중 오류 발생: {e}")
-            return "죄송합니다. 대화 생성 중 오류가 발생했습니다."
-          
-    def evaluate_debate(self, chat_history):
+            raise
+
+        turn = {'usage': None, 'text': ""}
         try:
-            logger.debug(f"chat_history content: {chat_history}")
-
-            full_chat = []
-            user_messages = []
-
-            for msg in chat_history:
-                if 'user' in msg:
-                    full_chat.append(f"User: {msg['user']}")
-                    user_messages.append(msg['user'])
-                if 'ai' in msg:
-                    full_chat.append(f"AI: {msg['ai']}")
-
-            full_chat_str = "\n".join(full_chat)
-            user_chat_str = "\n".join(user_messages)
-
-            template = '''
-            {{
-                "주제의 일관성": {{"점수": "점수", "코멘트": "코멘트", "개선을 위한 조언": "조언"}},
-                "논리적 연결성": {{"점수": "점수", "코멘트": "코멘트", "개선을 위한 조언": "조언"}},
-                "반박의 적절성": {{"점수": "점수", "코멘트": "코멘트", "개선을 위한 조언": "조언"}},
-                "근거의 타당성": {{"점수": "점수", "코멘트": "코멘트", "개선을 위한 조언": "조언"}},
-                "총점": "0-100"
-            }}'''
-
-            evaluation_prompt = f"""
-            당신은 토론대회의 심판자입니다.
-            다음은 전체 토론 대화 내용입니다:
-            {full_chat_str}
-
-            그리고 다음은 사용자("User")가 한 발언들입니다:
-            {user_chat_str}
-
-            사용자의 발언들에 대해서만 다음 기준에 따라 평가해 주세요:
-            1. 주제의 일관성 : 발언들이 주제에 부합하고 일관성이 있는가?
-            2. 논리적 연결성 : 발언들의 흐름과 논리적 연결성이 잘 유지되었는가?
-            3. 반박의 적절성 : 상대방의 주장을 이해하고 적절히 반박하였는가?
-            4. 근거의 타당성 : 주장에 대한 근거가 충분히 타당하고 논리적인가?
-
-            각 항목을 25점 만점으로 평가하고, 점수와 함께 간단한 코멘트와 개선을 위한 구체적인 조언을 제시해 주세요.
-            개선 방안에서는 사용자가 실제로 말한 문장을 제시하고, 어떻게 바꾸면 더 나은 점수를 받을 수 있는지 구체적으로 설명해 주세요.
-            마지막에는 총점(100점 만점)을 제시해 주세요.
-
-            **반드시 아래의 형식을 따르세요:**
-            반환하는 JSON은 두 개의 중괄호로 감싸야 합니다. 예를 들어:
-            {template}
-
-            주의: **모든 중괄호**는 **반드시 2개를 겹쳐서** 반환하세요. 이는 필수사항입니다.
-            """
-
-
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20240620",
-                max_tokens=3000,
-                messages=[{"role": "user", "content": evaluation_prompt}]
-            )
+            async for chunk in stream:
+                if chunk.type == "message_stop":
+                    break
+                text = self.read_stream_event(chunk, turn)
+                if text:
+                    yield text
+        except Exception as e:
+            llm_guard.stream_failed(e)
+            raise
+
+        self.finish_turn(user_input, turn)
+
+    def format_transcript(self, chat_history):
+        # (전체 대화, 사용자 발언만) 문자열
+        logger.debug(f"chat_history content: {chat_history}")
+
+        full_chat = []
+        user_messages = []
+
+        for msg in chat_history:
+            if 'user' in msg:
+                full_chat.append(f"User: {msg['user']}")
+                user_messages.append(msg['user'])
+            if 'ai' in msg:
+                full_chat.append(f"AI: {msg['ai']}")
 
-            response_text = response.content[0].text
-            logger.info(f"AI response: {response_text}")
+        return "\n".join(full_chat), "\n".join(user_messages)
 
-            # JSON 형식 수정
-            response_text = response_text.replace('{{', '{').replace('}}', '}')
-            response_text = response_text.replace('": "', '": "').replace('", "', '", "')
+    def evaluation_prompt(self, chat_history):
+        full_chat_str, user_chat_str = self.format_transcript(chat_history)
 
-            # 이스케이프된 큰따옴표를 일반 큰따옴표로 변환
-            response_text = response_text.replace('\\"', '"')
+        criteria = "\n".join(f"{i}. {name} : {evaluation.CRITERIA_QUESTIONS[name]}"
+                             for i, name in enumerate(evaluation.CRITERIA, 1))
+
+        return f"""
+        당신은 토론대회의 심판자입니다.
+        다음은 전체 토론 대화 내용입니다:
+        {full_chat_str}
+
+        그리고 다음은 사용자("User")가 한 발언들입니다:
+        {user_chat_str}
+
+        사용자의 발언들에 대해서만 다음 기준에 따라 평가해 주세요:
+        {criteria}
+
+        각 항목을 {evaluation.MAX_SCORE}점 만점으로 평가하고, 점수와 함께 간단한 코멘트와 개선을 위한 구체적인 조언을 제시해 주세요.
+        개선 방안에서는 사용자가 실제로 말한 문장을 제시하고, 어떻게 바꾸면 더 나은 점수를 받을 수 있는지 구체적으로 설명해 주세요.
+        결과는 {evaluation.EVALUATION_TOOL['name']} 도구로 제출하세요. 총점은 따로 계산합니다.
+        """
 
-            self.evaluation_result = json.loads(response_text)
-            return self.evaluation_result
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON parsing error: {e}")
-            logger.error(f"Problematic JSON string: {response_text}")
-            return {"error": str(e), "raw_response": response_text}
+    def evaluation_request(self, chat_history):
+        # 루브릭 스키마를 도구 입력으로 강제해 구조화된 결과를 받음
+        return evaluation.tool_request("claude-3-5-sonnet-20240620", 3000, self.evaluation_prompt(chat_history))
+
+    def set_evaluation(self, result, key=None):
+        # 검증된 EvaluationResult를 저장하고 화면용 dict를 반환 (key가 있으면 평가 캐시에도 저장)
+        self.evaluation = result
+        self.evaluation_result = result.to_dict()
+        if key:
+            self.evaluation_cache.put(key, self.evaluation_result)
+        return self.evaluation_result
+
+    # 평가 캐시: (주제, 입장, 루브릭 버전, 평가 방식, 대화 기록)이 같으면 저장된 결과를 바로 돌려주고 LLM을 다시 호출하지 않음
+    # 평가 방식: holistic(전체 대화를 한 번에, 스트리밍 여부와 무관), parallel(기준별 병렬), incremental(턴 평균)
+
+    def evaluation_key(self, mode, turns):
+        topic = self.selected_topic['topic'] if getattr(self, 'selected_topic', None) else ''
+        return cache_key(topic, getattr(self, 'user_stance', None), evaluation.RUBRIC_VERSION, mode, turns)
+
+    def history_key(self, mode, chat_history):
+        # 화면의 chat_history({"user", "ai"} 목록) 기준 캐시 키
+        return self.evaluation_key(mode, [(msg.get('user', ''), msg.get('ai', '')) for msg in chat_history])
+
+    def cached_evaluation(self, key):
+        cached = self.evaluation_cache.get(key)
+        if cached is None:
+            return None
+        logger.info(f"평가 캐시 적중: {key[:12]}")
+        return self.set_evaluation(evaluation.validate(cached))
+
+    def cached_sections(self, key):
+        # 캐시 적중 시 스트리밍 평가가 내보낼 (항목, 값) 목록, 없으면 None
+        cached = self.cached_evaluation(key)
+        if cached is None:
+            return None
+        return [(name, cached[name]) for name in evaluation.CRITERIA] + [(evaluation.TOTAL_KEY, cached[evaluation.TOTAL_KEY])]
+
+    def evaluate_debate(self, chat_history):
+        raw = None
+        key = self.history_key('holistic', chat_history)
+        try:
+            cached = self.cached_evaluation(key)
+            if cached is not None:
+                return cached
+            response = llm_guard.call(self.client.messages.create, name="토론 평가", **self.evaluation_request(chat_history))
+            raw = evaluation.tool_input(response)
+            return self.set_evaluation(evaluation.validate(raw), key)
+        except evaluation.RubricValidationError as e:
+            logger.error(f"Evaluation validation error: {e}")
+            return evaluation.error_result(e, raw)
         except Exception as e:
             logger.error(f"Error in evaluate_debate: {str(e)}")
-            return {"error": str(e), "raw_response": response_text}
\ No newline at end of file
+            return evaluation.error_result(e, raw)
+
+    async def aevaluate_debate(self, chat_history):
+        # evaluate_debate의 비동기 버전
+        raw = None
+        key = self.history_key('holistic', chat_history)
+        try:
+            cached = self.cached_evaluation(key)
+            if cached is not None:
+                return cached
+            response = await llm_guard.acall(self.async_client.messages.create, name="토론 평가",
+                                             **self.evaluation_request(chat_history))
+            raw = evaluation.tool_input(response)
+            return self.set_evaluation(evaluation.validate(raw), key)
+        except evaluation.RubricValidationError as e:
+            logger.error(f"Evaluation validation error: {e}")
+            return evaluation.error_result(e, raw)
+        except Exception as e:
+            logger.error(f"Error in aevaluate_debate: {str(e)}")
+            return evaluation.error_result(e, raw)
+
+    async def aevaluate_stream(self, chat_history):
+        # 전체 평가를 스트리밍으로 받으며, 도구 입력 JSON에서 평가 항목의 객체가 닫힐 때마다 (항목, 값)을 내보냄
+        # 끝나면 전체를 검증해 총점을 내보내고 evaluation_result에 저장
+        key = self.history_key('holistic', chat_history)
+        cached = self.cached_sections(key)
+        if cached is not None:
+            for member in cached:
+                yield member
+            return
+
+        parser = JsonObjectStream()
+        stream = await llm_guard.acall(self.async_client.messages.create, name="토론 평가",
+                                       stream=True, **self.evaluation_request(chat_history))
+        try:
+            async for chunk in stream:
+                if chunk.type == "message_stop":
+                    break
+                if chunk.type == "content_block_delta" and chunk.delta.type == "input_json_delta":
+                    for name, value in parser.feed(chunk.delta.partial_json):
+                        if name in evaluation.CRITERIA:
+                            try:
+                                yield name, evaluation.validate_criterion(name, value).to_dict()
+                            except evaluation.RubricValidationError as e:
+                                logger.error(f"Evaluation validation error: {e}")
+        except Exception as e:
+            llm_guard.stream_failed(e)
+            raise
+        parser.close()
+
+        try:
+            result = evaluation.validate(parser.result)
+        except evaluation.RubricValidationError as e:
+            logger.error(f"Evaluation validation error: {e}")
+            self.evaluation_result = evaluation.error_result(e, parser.result)
+            return
+        self.set_evaluation(result, key)
+        yield evaluation.TOTAL_KEY, result.total
+
+    # 기준별 병렬 평가: 네 기준을 동시에 작은 요청으로 보내고 총점은 로컬에서 계산
+
+    def criterion_prompt(self, name, chat_history):
+        full_chat_str, user_chat_str = self.format_transcript(chat_history)
+        return f"""
+        당신은 토론대회의 심판자입니다.
+        다음은 전체 토론 대화 내용입니다:
+        {full_chat_str}
+
+        그리고 다음은 사용자("User")가 한 발언들입니다:
+        {user_chat_str}
+
+        사용자의 발언들을 "{name}" 기준 하나로만 평가해 주세요: {evaluation.CRITERIA_QUESTIONS[name]}
+
+        {evaluation.MAX_SCORE}점 만점으로 평가하고, 점수와 함께 간단한 코멘트와 개선을 위한 구체적인 조언을 제시해 주세요.
+        개선 방안에서는 사용자가 실제로 말한 문장을 제시하고, 어떻게 바꾸면 더 나은 점수를 받을 수 있는지 구체적으로 설명해 주세요.
+        결과는 {evaluation.CRITERION_TOOL['name']} 도구로 제출하세요.
+        """
+
+    async def ajudge_criterion(self, name, chat_history):
+        request = evaluation.tool_request("claude-3-5-sonnet-20240620", evaluation.CRITERION_MAX_TOKENS,
+                                          self.criterion_prompt(name, chat_history), evaluation.CRITERION_TOOL)
+        response = await llm_guard.acall(self.async_client.messages.create, name=f"{name} 평가", **request)
+        return name, evaluation.validate_criterion(name, evaluation.tool_input(response, evaluation.CRITERION_TOOL))
+
+    async def aevaluate_parallel_stream(self, chat_history):
+        # 네 기준을 동시에 평가하며 끝나는 순서대로 (기준, 값)을 내보내고, 모두 끝나면 총점을 내보냄
+        # 실패한 기준이 있으면 나머지 결과는 보여 주되 evaluation_result는 오류로 저장
+        key = self.history_key('parallel', chat_history)
+        cached = self.cached_sections(key)
+        if cached is not None:
+            for member in cached:
+                yield member
+            return
+
+        criteria, failed = {}, []
+        tasks = [asyncio.ensure_future(self.ajudge_criterion(name, chat_history)) for name in evaluation.CRITERIA]
+        try:
+            for task in asyncio.as_completed(tasks):
+                try:
+                    name, result = await task
+                except Exception as e:
+                    logger.error(f"Error in criterion evaluation: {e}")
+                    failed.append(str(e))
+                    continue
+                criteria[name] = result
+                yield name, result.to_dict()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if failed:
+            self.evaluation_result = evaluation.error_result(f"일부 기준을 평가하지 못했습니다: {'; '.join(failed)}",
+                                                             {name: result.to_dict() for name, result in criteria.items()})
+            return
+        result = self.set_evaluation(evaluation.EvaluationResult({name: criteria[name] for name in evaluation.CRITERIA}), key)
+        yield evaluation.TOTAL_KEY, result[evaluation.TOTAL_KEY]
+
+    # 턴 단위 평가: 답변이 끝날 때마다 그 턴을 공유 이벤트 루프에서 채점해 두고, 토론 종료 시에는 모으기만 함
+
+    def score_turn(self, index):
+        # index번째 턴을 채점하는 코루틴, 프롬프트와 결과를 넣을 dict는 지금 토론의 것으로 고정
+        # (실행 중에 start_debate로 새 토론이 시작되어도 새 토론의 turn_scores/turn_jobs를 건드리지 않음)
+        user, ai = self.debate_turns[index]
+        previous_ai = self.debate_turns[index - 1][1] if index > 0 else ""
+        prompt = evaluation.turn_prompt(self.selected_topic['topic'], self.user_stance, previous_ai, user, ai)
+        return self.ascore_turn(index, prompt, self.turn_scores, self.turn_jobs)
+
+    def schedule_turn_scoring(self, index):
+        self.turn_jobs[index] = asyncio.run_coroutine_threadsafe(self.score_turn(index), async_runtime.get_loop())
+
+    async def ascore_turn(self, index, prompt, turn_scores, turn_jobs):
+        try:
+            response = await llm_guard.acall(
+                self.async_client.messages.create,
+                name="턴 평가",
+                **evaluation.tool_request(evaluation.TURN_MODEL, evaluation.TURN_MAX_TOKENS, prompt)
+            )
+            turn_scores[index] = evaluation.validate(evaluation.tool_input(response))
+            logger.info(f"턴 {index + 1} 평가 완료: {[item.score for item in turn_scores[index].criteria.values()]}")
+        except Exception as e:
+            # 실패한 턴은 토론 종료 시 다시 채점
+            logger.error(f"턴 {index + 1} 평가 중 오류 발생: {e}")
+        finally:
+            turn_jobs.pop(index, None)
+
+    async def aevaluate_incremental(self):
+        # 진행 중인 턴 평가를 기다리고, 실패했거나 빠진 턴만 다시 채점한 뒤 모음
+        key = self.evaluation_key('incremental', self.debate_turns)
+        cached = self.cached_evaluation(key)
+        if cached is not None:
+            return cached
+        pending = [asyncio.wrap_future(job) for job in list(self.turn_jobs.values())]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        missing = [index for index in range(len(self.debate_turns)) if index not in self.turn_scores]
+        if missing:
+            await asyncio.gather(*(self.score_turn(index) for index in missing))
+        if len(self.turn_scores) < len(self.debate_turns):
+            return evaluation.error_result("일부 발언을 평가하지 못했습니다. 잠시 후 다시 시도해 주세요.", "")
+        return self.set_evaluation(evaluation.aggregate([self.turn_scores[i] for i in range(len(self.debate_turns))]), key)
@@ -0,0 +1,24 @@
+import re
+import unicodedata
+
+# 태그(<...>)와 특수 문자를 한 번의 스캔으로 제거하는 정규식
+# - '<'는 태그가 아닐 때만 특수 문자로 지우도록 따로 처리 (예: '.<b c>'에서 태그가 통째로 지워지도록)
+# - 공백 정리는 정규식 대신 str.split()/join으로 처리 (\s와 같은 공백 문자 집합)
+# 기존 preprocess_text의 3단계(태그 제거 -> 특수 문자 제거 -> 공백 정리)와 같은 결과
+_PATTERN = re.compile(r'<[^>\n]*>|[^\w\s<]+|<')
+
+def normalize_text(text, form=None):
+    # form: None, 'NFC', 'NFKC' 중 하나
+    # NFC는 분리된 한글 자모(예: 'ᄒ' + 'ᅡ' + 'ᆫ')를 완성형 음절('한')로 합침
+    if form is not None:
+        text = unicodedata.normalize(form, text)
+    return ' '.join(_PATTERN.sub('', text).split())
+
+def normalize_batch(texts, form=None):
+    # 여러 문서를 한 번에 정규화 (루프 안에서 전역 조회를 피하도록 지역 변수에 바인딩)
+    sub = _PATTERN.sub
+    join = ' '.join
+    if form is None:
+        return [join(sub('', text).split()) for text in texts]
+    normalize = unicodedata.normalize
+    return [join(sub('', normalize(form, text)).split()) for text in texts]
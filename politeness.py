@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# 서버 과부하/요청 제한을 의미하는 상태 코드
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+def host_of(url):
+    return urlsplit(url).netloc
+
+def parse_crawl_delay(robots_text, user_agent='*'):
+    # urllib.robotparser는 정수 Crawl-delay만 인식하므로 소수(예: 0.5)도 직접 파싱
+    # user_agent에 해당하는 그룹이 없으면 '*' 그룹 값을 사용
+    delays = {}
+    agents = []
+    in_rules = False
+    for line in robots_text.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if ':' not in line:
+            continue
+        key, value = (part.strip() for part in line.split(':', 1))
+        key = key.lower()
+        if key == 'user-agent':
+            if in_rules:
+                agents = []
+                in_rules = False
+            agents.append(value.lower())
+        else:
+            in_rules = True
+            if key == 'crawl-delay':
+                try:
+                    delay = float(value)
+                except ValueError:
+                    continue
+                for agent in agents:
+                    delays.setdefault(agent, delay)
+    return delays.get(user_agent.lower(), delays.get('*'))
+
+class HostState:
+    def __init__(self, delay):
+        self.delay = delay          # 현재 요청 간격(초)
+        self.crawl_delay = 0.0      # robots.txt의 Crawl-delay
+        self.next_slot = 0.0        # 다음 요청이 가능한 시각 (monotonic)
+        self.latency = None         # 응답 지연 EWMA
+        self.baseline = None        # 지금까지 가장 낮았던 지연 EWMA (평소 지연)
+        self.requests = 0
+        self.throttled = 0
+
+class PolitenessScheduler:
+    # 호스트별로 요청 간격을 조절하는 스케줄러
+    # - robots.txt Crawl-delay를 하한으로 사용
+    # - 정상 응답이면 간격을 점진적으로 줄이고, 응답이 평소보다 latency_rise배 이상 느려지면 지연에 비례해 늘림
+    #   (평소 지연만큼은 호스트별 동시 요청 수 제한이 이미 반영하므로 간격에 더하지 않음)
+    # - 429/5xx 응답이면 간격을 배로 늘리고 Retry-After를 존중
+    def __init__(self, initial_delay=1.0, min_delay=0.0, max_delay=30.0,
+                 backoff=2.0, recovery=0.8, latency_factor=0.5, latency_rise=1.5, smoothing=0.3,
+                 user_agent='*'):
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.recovery = recovery
+        self.latency_factor = latency_factor
+        self.latency_rise = latency_rise
+        self.smoothing = smoothing
+        self.user_agent = user_agent
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, url):
+        host = host_of(url)
+        if host not in self._hosts:
+            self._hosts[host] = HostState(self.initial_delay)
+        return self._hosts[host]
+
+    def _floor(self, state):
+        return max(self.min_delay, state.crawl_delay)
+
+    def robots_url(self, url):
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}/robots.txt"
+
+    def configure_from_robots(self, url, robots_text):
+        # robots.txt 본문을 받아 해당 호스트의 Crawl-delay를 반영
+        crawl_delay = parse_crawl_delay(robots_text, self.user_agent)
+        with self._lock:
+            state = self._state(url)
+            state.crawl_delay = float(crawl_delay or 0.0)
+            state.delay = max(state.delay, self._floor(state))
+        logger.info(f"{host_of(url)} crawl-delay: {state.crawl_delay}s")
+
+    def reserve(self, url):
+        # 다음 요청 슬롯을 예약하고 기다려야 할 시간(초)을 반환
+        with self._lock:
+            state = self._state(url)
+            now = time.monotonic()
+            slot = max(now, state.next_slot)
+            state.next_slot = slot + state.delay
+            return slot - now
+
+    def wait(self, url):
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, url):
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record(self, url, status, latency, retry_after=None):
+        # 응답 결과를 반영해 요청 간격을 조정
+        with self._lock:
+            state = self._state(url)
+            state.requests += 1
+            if state.latency is None:
+                state.latency = latency
+            else:
+                state.latency += self.smoothing * (latency - state.latency)
+            state.baseline = state.latency if state.baseline is None else min(state.baseline, state.latency)
+
+            if status in THROTTLE_STATUSES:
+                state.throttled += 1
+                state.delay = min(self.max_delay, max(state.delay, 0.1) * self.backoff)
+                if retry_after is not None:
+                    state.delay = min(self.max_delay, max(state.delay, retry_after))
+                    state.next_slot = max(state.next_slot, time.monotonic() + retry_after)
+            else:
+                state.delay = max(self._floor(state), state.delay * self.recovery)
+                if state.latency > state.baseline * self.latency_rise:
+                    state.delay = max(state.delay, state.latency * self.latency_factor)
+            state.delay = min(state.delay, self.max_delay)
+
+    def delay(self, url):
+        return self._state(url).delay
+
+    def rate(self, url):
+        # 현재 허용되는 초당 요청 수
+        delay = self.delay(url)
+        return float('inf') if delay == 0 else 1.0 / delay
+
+    def stats(self):
+        with self._lock:
+            return {
+                host: {
+                    'delay': state.delay,
+                    'rate': float('inf') if state.delay == 0 else 1.0 / state.delay,
+                    'crawl_delay': state.crawl_delay,
+                    'latency': state.latency,
+                    'baseline_latency': state.baseline,
+                    'requests': state.requests,
+                    'throttled': state.throttled,
+                }
+                for host, state in self._hosts.items()
+            }
+
+def parse_retry_after(value):
+    # Retry-After 헤더(초 단위)만 지원하고, 날짜 형식은 무시
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+
+import anthropic
+
+from politeness import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# main.py의 모든 LLM 호출을 감싸는 재시도/서킷 브레이커 계층
+# - 일시적인 오류(연결 오류, 408/409/429/5xx, 529 overloaded)는 지수 백오프 + full jitter로 재시도
+#   retry-after(-ms) 헤더가 있으면 그보다 먼저 다시 보내지 않음
+# - 연속 실패가 failure_threshold번 쌓이면 서킷을 열고 reset_timeout 동안 호출 없이 바로 CircuitOpenError를 냄
+#   그 뒤 한 번의 시험 호출이 성공하면 다시 닫고, 실패하면 다시 엶 (취소되면 다음 호출이 다시 시험함)
+# - stats()로 호출/재시도/실패/차단 횟수와 재시도로 늘어난 지연을 볼 수 있음
+#
+# SDK 자체 재시도와 겹치지 않도록 llm_clients의 클라이언트는 max_retries=0으로 만듦
+
+MAX_ATTEMPTS = 4
+BASE_DELAY = 0.5
+MAX_DELAY = 8.0
+MAX_RETRY_AFTER = 30.0      # retry-after가 이보다 길면 기다리지 않고 실패로 처리
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30.0
+RETRY_STATUSES = {408, 409, 429}
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_in):
+        super().__init__(f"LLM 서비스 호출이 일시적으로 차단되었습니다 ({retry_in:.0f}초 후 재시도 가능)")
+        self.retry_in = retry_in
+
+def is_retryable(error):
+    if isinstance(error, anthropic.APIConnectionError):     # APITimeoutError 포함
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in RETRY_STATUSES or error.status_code >= 500
+    return False
+
+def retry_after(error):
+    # 응답 헤더의 retry-after-ms / retry-after (초)
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    milliseconds = parse_retry_after(response.headers.get('retry-after-ms'))
+    if milliseconds is not None:
+        return milliseconds / 1000
+    return parse_retry_after(response.headers.get('retry-after'))
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half_open' if time.monotonic() - self.opened_at >= self.reset_timeout else 'open'
+
+    def before_call(self):
+        # 열린 상태면 CircuitOpenError, reset_timeout이 지났으면 시험 호출 하나만 통과시킴
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = time.monotonic() - self.opened_at
+            if waited < self.reset_timeout or self.probing:
+                raise CircuitOpenError(max(self.reset_timeout - waited, 0.0))
+            self.probing = True
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info("LLM 서킷 닫힘")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+                logger.warning(f"LLM 서킷 열림: 연속 실패 {self.failures}번, {self.reset_timeout}초 동안 호출 차단")
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def release(self):
+        # 시험 호출이 결과 없이 끝났을 때(취소 등) 서킷 상태는 그대로 두고 다음 시험 호출을 허용
+        with self._lock:
+            self.probing = False
+
+class Resilience:
+    def __init__(self, max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY, max_delay=MAX_DELAY,
+                 max_retry_after=MAX_RETRY_AFTER, breaker=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.breaker = breaker or CircuitBreaker()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.short_circuits = 0
+        self.retried_calls = 0
+        self.retry_latency = 0.0    # 재시도 때문에 늘어난 시간 합계 (실패한 시도 + 대기)
+        self._lock = threading.Lock()
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def _delay(self, attempt, error):
+        # 다음 시도까지 기다릴 시간, 재시도하지 않을 오류면 None
+        if attempt >= self.max_attempts or not is_retryable(error):
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        hinted = retry_after(error)
+        if hinted is not None:
+            if hinted > self.max_retry_after:
+                return None
+            delay = max(delay, hinted)
+        return delay
+
+    def _check(self):
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self._count(short_circuits=1)
+            raise
+
+    def _failed(self, error, attempt, name):
+        # 4xx처럼 재시도할 수 없는 오류는 공급자가 정상 응답한 것이므로 서킷에는 성공으로 반영
+        if is_retryable(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        delay = self._delay(attempt, error)
+        if delay is None:
+            self._count(failures=1)
+            logger.error(f"{name} 실패 ({attempt}번째 시도): {error}")
+        else:
+            self._count(retries=1)
+            logger.warning(f"{name} 재시도 {attempt}/{self.max_attempts - 1}: {delay:.2f}초 후 ({error})")
+        return delay
+
+    def _finished(self, started, attempt_started, attempt):
+        # 성공한 시도가 시작되기 전까지 걸린 시간(실패한 시도 + 대기)이 재시도로 늘어난 지연
+        self.breaker.record_success()
+        if attempt > 1:
+            self._count(retried_calls=1, retry_latency=attempt_started - started)
+
+    def call(self, func, *args, name='LLM 호출', **kwargs):
+        self._count(calls=1)
+        started = time.monotonic()
+        for attempt in range(1, self.max_attempts + 1):
+            self._check()
+            attempt_started = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                delay = self._failed(e, attempt, name)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+            self._finished(started, attempt_started, attempt)
+            return result
+
+    async def acall(self, func, *args, name='LLM 호출', **kwargs):
+        # call의 비동기 버전 (func는 코루틴 함수)
+        self._count(calls=1)
+        started = time.monotonic()
+        for attempt in range(1, self.max_attempts + 1):
+            self._check()
+            attempt_started = time.monotonic()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                delay = self._failed(e, attempt, name)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # asyncio.CancelledError, KeyboardInterrupt 등: 시험 호출 자리를 비워 두지 않으면 서킷이 계속 막힘
+                self.breaker.release()
+                raise
+            self._finished(started, attempt_started, attempt)
+            return result
+
+    def stream_failed(self, error):
+        # 스트림 도중의 오류는 이미 일부를 보낸 뒤라 재시도하지 않고 서킷에만 반영
+        self.breaker.record_failure()
+        self._count(failures=1)
+        logger.error(f"LLM 스트림 중 오류: {error}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'retries': self.retries,
+                'retried_calls': self.retried_calls,
+                'failures': self.failures,
+                'short_circuits': self.short_circuits,
+                'retry_latency_total': round(self.retry_latency, 3),
+                'retry_latency_avg': round(self.retry_latency / self.retried_calls, 3) if self.retried_calls else 0.0,
+                'circuit': self.breaker.state,
+            }
+
+# 프로세스 전체에서 하나의 공급자(Anthropic)를 공유하므로 서킷과 지표도 하나
+llm_guard = Resilience()
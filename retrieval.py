@@ -0,0 +1,145 @@
+import heapq
+import json
+import logging
+import math
+import os
+import pickle
+import threading
+import time
+from collections import Counter, defaultdict
+
+from chunking import chunk_articles
+from normalizer import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# crawled_articles.json의 토론 교육 자료를 문단 단위로 나눠 BM25로 검색하는 역색인
+# - 토큰: 한국어 조사/어미 변화에 강하도록 어절을 문자 bigram으로 나눔 (한 글자 어절은 그대로)
+# - 색인은 한 번 만들어 INDEX_PATH에 저장하고, 원본 JSON이 바뀌지 않았으면 다음 실행 때 그대로 불러옴
+# - 문단 나누기는 chunking.py를 TF-IDF 색인(tfidf_index.py)과 공유함
+
+CORPUS_PATH = 'crawled_articles.json'
+INDEX_PATH = 'bm25_index.pkl'
+INDEX_VERSION = 2
+K1 = 1.5
+B = 0.75
+
+def tokenize(text):
+    tokens = []
+    for word in normalize_text(text).lower().split():
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+class BM25Index:
+    LABEL = 'BM25'
+
+    def __init__(self, passages, k1=K1, b=B):
+        # passages: [{'title':..., 'url':..., 'text':...}, ...]
+        self.passages = passages
+        doc_tokens = [Counter(tokenize(p['title'] + ' ' + p['text'])) for p in passages]
+        lengths = [sum(counts.values()) for counts in doc_tokens]
+        avg_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+        document_frequency = Counter()
+        for counts in doc_tokens:
+            document_frequency.update(counts.keys())
+
+        # 검색 시 덧셈만 하도록 (문단, BM25 가중치)를 미리 계산해 둠
+        count = len(passages)
+        self.postings = defaultdict(list)
+        for doc, (counts, length) in enumerate(zip(doc_tokens, lengths)):
+            norm = k1 * (1 - b + b * length / avg_length) if avg_length else k1
+            for token, tf in counts.items():
+                df = document_frequency[token]
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                self.postings[token].append((doc, idf * tf * (k1 + 1) / (tf + norm)))
+        self.postings = dict(self.postings)
+
+    @classmethod
+    def from_articles(cls, articles):
+        return cls(chunk_articles(articles))
+
+    def search(self, query, top_k=3):
+        # (점수, 문단) 목록을 점수 내림차순으로 반환
+        scores = defaultdict(float)
+        for token in set(tokenize(query)):
+            for doc, weight in self.postings.get(token, ()):
+                scores[doc] += weight
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(score, self.passages[doc]) for doc, score in best]
+
+    def search_batch(self, queries, top_k=3):
+        return [self.search(query, top_k) for query in queries]
+
+def source_signature(path):
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+# 색인 저장/불러오기는 BM25와 TF-IDF 색인이 같이 사용 (index_class: from_articles와 LABEL이 있는 색인 클래스)
+# 저장된 색인은 (색인 버전, 원본 크기, 원본 수정 시각)이 같을 때만 재사용
+
+def build_index(corpus_path=CORPUS_PATH, index_path=INDEX_PATH, index_class=BM25Index, version=INDEX_VERSION):
+    with open(corpus_path, 'r', encoding='utf-8') as f:
+        articles = json.load(f)
+    index = index_class.from_articles(articles)
+    with open(index_path, 'wb') as f:
+        pickle.dump({'signature': (version,) + source_signature(corpus_path), 'index': index}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return index
+
+def load_index(corpus_path=CORPUS_PATH, index_path=INDEX_PATH, index_class=BM25Index, version=INDEX_VERSION):
+    # 저장된 색인이 원본과 맞으면 불러오고, 없거나 오래됐으면 새로 만들어 저장
+    start = time.perf_counter()
+    try:
+        with open(index_path, 'rb') as f:
+            saved = pickle.load(f)
+        if saved.get('signature') == (version,) + source_signature(corpus_path):
+            logger.info(f"{index_class.LABEL} 색인 로드: {len(saved['index'].passages)}개 문단 ({time.perf_counter() - start:.3f}s)")
+            return saved['index']
+    except (FileNotFoundError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+    index = build_index(corpus_path, index_path, index_class, version)
+    logger.info(f"{index_class.LABEL} 색인 생성: {len(index.passages)}개 문단 ({time.perf_counter() - start:.3f}s)")
+    return index
+
+INDEX_KINDS = ('bm25', 'tfidf')
+DEFAULT_INDEX_KIND = 'bm25'
+
+_indexes = {}
+_index_lock = threading.Lock()
+
+def get_index(kind=DEFAULT_INDEX_KIND):
+    # 프로세스 전체에서 종류별로 하나의 색인을 공유 (자료 파일이 없으면 None)
+    # 두 색인 모두 search(query, top_k)와 search_batch(queries, top_k)를 제공
+    if kind not in INDEX_KINDS:
+        raise ValueError(f"Unknown index kind: {kind}")
+    if kind not in _indexes:
+        with _index_lock:
+            if kind not in _indexes:
+                try:
+                    if kind == 'tfidf':
+                        # numpy/scipy는 TF-IDF 색인을 쓸 때만 필요
+                        import tfidf_index
+                        _indexes[kind] = tfidf_index.load_index()
+                    else:
+                        _indexes[kind] = load_index()
+                except FileNotFoundError as e:
+                    logger.error(f"검색 자료를 찾을 수 없습니다: {e}")
+                    return None
+    return _indexes[kind]
+
+if __name__ == "__main__":
+    import sys
+    # 이 파일을 스크립트로 실행하면 클래스가 __main__.BM25Index로 pickle되어 앱에서 불러오지 못하므로
+    # 모듈로 다시 import한 build_index로 저장
+    from retrieval import build_index
+    index = build_index()
+    query = sys.argv[1] if len(sys.argv) > 1 else '반박할 때 상대방 주장의 근거를 확인해야 한다'
+    start = time.perf_counter()
+    results = index.search(query)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{len(index.passages)} passages indexed, query took {elapsed:.2f} ms")
+    for score, passage in results:
+        print(f"{score:6.2f}  {passage['title']}: {passage['text'][:80]}...")
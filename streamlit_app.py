@@ -4,6 +4,10 @@ import os
 import sys
 from dotenv import load_dotenv
 from main import DebateBot
+import async_runtime
+import llm_clients
+from resilience import CircuitOpenError, llm_guard
+from evaluation import CRITERIA, MAX_SCORE
 import time
 import traceback
 
@@ -17,6 +21,13 @@ load_dotenv()
 # 디버그 모드 설정
 DEBUG_MODE = False
 
+# 토론 종료 시 평가 방식
+# - incremental: 턴마다 미리 채점한 점수를 모으기만 함
+# - stream: 전체 대화를 한 번에 평가하며 항목별로 스트리밍
+# - parallel: 네 기준을 동시에 평가하며 끝나는 순서대로 표시
+EVALUATION_MODE = os.getenv("EVALUATION_MODE", "incremental")
+EVALUATION_CATEGORIES = CRITERIA
+
 # 세션 상태 초기화 함수
 def initialize_session_state():
     if 'debate_bot' not in st.session_state:
@@ -24,7 +35,8 @@ def initialize_session_state():
         if not api_key:
             st.error("API key not found. Please set it in your .env file.")
             st.stop()
-        st.session_state.debate_bot = DebateBot(api_key)
+        # 턴마다 미리 채점하는 비용은 incremental 모드에서만 씀
+        st.session_state.debate_bot = DebateBot(api_key, turn_scoring=EVALUATION_MODE == "incremental")
         logger.info("DebateBot initialized")
 
     if 'chat_history' not in st.session_state:
@@ -33,6 +45,9 @@ def initialize_session_state():
     if 'evaluation_result' not in st.session_state:
         st.session_state.evaluation_result = None
 
+    if 'evaluation_pending' not in st.session_state:
+        st.session_state.evaluation_pending = False
+
     if 'selected_topic' not in st.session_state:
         st.session_state.selected_topic = None
 
@@ -51,8 +66,8 @@ def initialize_session_state():
 # 세션 상태 초기화 실행
 initialize_session_state()
 
-# 초기 데이터 로드
-st.session_state.debate_bot.load_data()
+# 주제/캐릭터 카탈로그 (모든 세션이 공유, 파일이 바뀌었을 때만 다시 읽음)
+catalog = st.session_state.debate_bot.catalog
 
 def get_styles():
     return """
@@ -171,13 +186,13 @@ def show_topic_selection():
     st.markdown(get_header(), unsafe_allow_html=True)
     debug_info()
 
-    char_options = [char['char_type'] for char in st.session_state.debate_bot.debate_characters['characters']]
+    char_options = catalog.character_types()
     st.session_state.selected_char = st.selectbox("토론 상대의 말투를 선택해주세요:", char_options)
 
-    topic_types = list(set([topic['type'] for topic in st.session_state.debate_bot.debate_topics]))
+    topic_types = catalog.topic_types()
     selected_type = st.selectbox("토론 주제의 유형을 선택해주세요:", topic_types)
 
-    filtered_topics = [topic for topic in st.session_state.debate_bot.debate_topics if topic['type'] == selected_type]
+    filtered_topics = catalog.topics_of_type(selected_type)
     
     st.markdown("토론하고 싶은 주제를 선택하세요", unsafe_allow_html=True)
     col1, col2 = st.columns(2)
@@ -278,7 +293,8 @@ def show_chat_interface():
                         logger.info("대화 생성 시작")
                         ai_response = ""
                         start_time = time.time()
-                        for chunk in st.session_state.debate_bot.chat_stream(user_input):
+                        # 응답 스트리밍은 프로세스 공유 이벤트 루프에서 비동기로 처리
+                        for chunk in async_runtime.iterate(st.session_state.debate_bot.achat_stream(user_input), timeout=30):
                             ai_response += chunk
                             ai_response_container.markdown(display_message("AI", ai_response), unsafe_allow_html=True)
                             if time.time() - start_time > 30:
@@ -289,6 +305,10 @@ def show_chat_interface():
                     except TimeoutError as e:
                         st.error(f"대화 생성 중 타임아웃: {e}")
                         logger.error(f"TimeoutError: {e}")
+                    except CircuitOpenError as e:
+                        # 공급자 장애 중에는 요청을 보내지 않고 바로 안내
+                        st.warning(f"서버가 현재 과부하 상태입니다. 약 {e.retry_in:.0f}초 후 다시 시도해 주세요.")
+                        logger.warning(f"Circuit open: {e}")
                     except Exception as e:
                         st.error(f"대화 생성 중 오류가 발생했습니다: {e}")
                         logger.error(f"Error during chat generation: {e}", exc_info=True)
@@ -300,7 +320,15 @@ def show_chat_interface():
         if end_debate_button:
             logger.info(f"Chat history before evaluation: {st.session_state.chat_history}")
             try:
-                st.session_state.evaluation_result = st.session_state.debate_bot.evaluate_debate(st.session_state.chat_history)
+                # 턴마다 미리 채점해 둔 점수가 있으면 모으기만 하고,
+                # 아니면 평가 페이지에서 전체 대화 평가를 스트리밍으로 받으며 항목별로 보여줌
+                if EVALUATION_MODE == "incremental" and st.session_state.debate_bot.debate_turns:
+                    st.session_state.evaluation_result = async_runtime.run(
+                        st.session_state.debate_bot.aevaluate_incremental())
+                    st.session_state.evaluation_pending = False
+                else:
+                    st.session_state.debate_bot.evaluation_result = ''
+                    st.session_state.evaluation_pending = True
                 logger.info(f"Evaluation result: {st.session_state.debate_bot.evaluation_result}")
                 st.session_state.debate_started = False
                 logger.info("Debate ended and evaluated successfully")
@@ -318,6 +346,63 @@ def show_chat_interface():
                 sys.stdout.flush()  # 예외 발생 시에도 로그 강제 플러시
 
 
+def render_total(slot, total):
+    with slot.container():
+        if isinstance(total, dict) and '점수' in total:
+            st.markdown(f"**총점: {total['점수']} / 100**")
+            if '개선방안' in total:
+                st.markdown(f"**총평: {total['개선방안']}**")
+        else:
+            st.markdown(f"**총점: {total} / 100**")
+
+def render_category(slot, key, value):
+    with slot.container():
+        if isinstance(value, dict):
+            score = value.get('점수', 'N/A')  # 기본 값 설정
+            improvement = value.get('개선을 위한 조언', 'N/A')  # 기본 값 설정
+            st.markdown(f"**{key} ({score} / {MAX_SCORE})**")
+            st.markdown(f"- 개선방안: {improvement}")
+        else:
+            st.markdown(f"**{key}: {value}**")
+
+def stream_evaluation():
+    # 평가 응답을 스트리밍으로 받으며 항목이 완성될 때마다 해당 자리에 표시
+    st.subheader("토론 평가 결과")
+    total_slot = st.empty()
+    total_slot.info("총점 계산 중...")
+    st.markdown("### 세부 평가")
+    slots = {key: st.empty() for key in EVALUATION_CATEGORIES}
+    for key, slot in slots.items():
+        slot.info(f"{key} 평가 중...")
+
+    bot = st.session_state.debate_bot
+    try:
+        if EVALUATION_MODE == "parallel":
+            sections = bot.aevaluate_parallel_stream(st.session_state.chat_history)
+        else:
+            sections = bot.aevaluate_stream(st.session_state.chat_history)
+        for key, value in async_runtime.iterate(sections, timeout=60):
+            logger.info(f"Evaluation section received: {key}")
+            if key == '총점':
+                render_total(total_slot, value)
+            elif key in slots:
+                render_category(slots[key], key, value)
+    except Exception as e:
+        st.error(f"토론 평가 중 오류가 발생했습니다: {e}")
+        logger.error(f"Error during streaming evaluation: {e}", exc_info=True)
+        return
+    finally:
+        st.session_state.evaluation_pending = False
+
+    result = bot.evaluation_result
+    st.session_state.evaluation_result = result
+    missing = [key for key in EVALUATION_CATEGORIES + ['총점'] if key not in result]
+    if "error" in result:
+        st.error(f"평가 중 오류가 발생했습니다: {result['error']}")
+    elif missing:
+        for key in missing:
+            (total_slot if key == '총점' else slots[key]).warning(f"{key} 평가를 받지 못했습니다.")
+
 def show_evaluation_page():
     logger.info("Entering show_evaluation_page")
     logger.info(f"Current evaluation result: {st.session_state.debate_bot.evaluation_result}")
@@ -325,37 +410,22 @@ def show_evaluation_page():
     st.markdown(get_styles(), unsafe_allow_html=True)
     st.markdown(get_header(), unsafe_allow_html=True)
 
-    if st.session_state.debate_bot.evaluation_result:
+    if st.session_state.evaluation_pending:
+        stream_evaluation()
+    elif st.session_state.debate_bot.evaluation_result:
         result = st.session_state.debate_bot.evaluation_result
         logger.info(f"Displaying evaluation result: {result}")
         if "error" in result:
             st.error(f"평가 중 오류가 발생했습니다: {result['error']}")
             if "raw_response" in result:
                 st.text(f"AI의 원본 응답: {result['raw_response']}")
-        elif isinstance(result, dict) and all(key in result for key in ['주제의 일관성', '논리적 연결성', '반박의 적절성', '근거의 타당성', '총점']):
+        elif isinstance(result, dict) and all(key in result for key in EVALUATION_CATEGORIES + ['총점']):
             st.subheader("토론 평가 결과")
-
-            if isinstance(result['총점'], dict) and '점수' in result['총점']:
-                st.markdown(f"**총점: {result['총점']['점수']} / 100**")
-                if '개선방안' in result['총점']:
-                    st.markdown(f"**총평: {result['총점']['개선방안']}**")
-            else:
-                st.markdown(f"**총점: {result['총점']} / 100**")
+            render_total(st.empty(), result['총점'])
 
             st.markdown("### 세부 평가")
-            categories = ['주제의 일관성', '논리적 연결성', '반박의 적절성', '근거의 타당성']
-            scores = []
-
-            for key in categories:
-                if isinstance(result[key], dict):
-                    score = result[key].get('점수', 'N/A')  # 기본 값 설정
-                    improvement = result[key].get('개선을 위한 조언', 'N/A')  # 기본 값 설정
-                    st.markdown(f"**{key} ({score} / 25)**")
-                    st.markdown(f"- 개선방안: {improvement}")
-                    scores.append(score)
-                else:
-                    st.markdown(f"**{key}: {result[key]}**")
-                    scores.append(result[key])
+            for key in EVALUATION_CATEGORIES:
+                render_category(st.empty(), key, result[key])
         else:
             st.error("평가 결과가 예상한 형식이 아닙니다.")
             logger.error(f"Unexpected evaluation result format: {result}")
@@ -393,6 +463,15 @@ def main():
         if st.sidebar.button("Print Session State"):
             st.sidebar.json(st.session_state)
         
+        if st.sidebar.button("Print LLM Pool Stats"):
+            st.sidebar.json(llm_clients.pool_stats())
+
+        if st.sidebar.button("Print LLM Retry Stats"):
+            st.sidebar.json(llm_guard.stats())
+
+        if st.sidebar.button("Print Evaluation Cache Stats"):
+            st.sidebar.json(st.session_state.debate_bot.evaluation_cache.stats())
+
         if st.sidebar.button("Print Chat History"):
             st.sidebar.json(st.session_state.get('chat_history', []))
         
@@ -402,7 +481,8 @@ def main():
                     "selected_char": st.session_state.debate_bot.selected_char,
                     "selected_topic": st.session_state.debate_bot.selected_topic,
                     "user_stance": st.session_state.debate_bot.user_stance,
-                    "ai_stance": st.session_state.debate_bot.ai_stance
+                    "ai_stance": st.session_state.debate_bot.ai_stance,
+                    "turn_usage": st.session_state.debate_bot.turn_usage
                 }
                 st.sidebar.json(bot_state)
             else:
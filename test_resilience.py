@@ -0,0 +1,59 @@
+import asyncio
+
+from resilience import CircuitBreaker, CircuitOpenError, Resilience
+
+# 서킷 브레이커의 시험 호출(half-open)이 취소되어도 서킷이 영구히 막히지 않는지 확인
+# 실행: python -m pytest -q test_resilience.py
+
+class Unavailable(Exception):
+    pass
+
+def open_guard():
+    guard = Resilience(max_attempts=1, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.0))
+    guard.breaker.record_failure()
+    assert guard.breaker.state == 'half_open'
+    return guard
+
+def test_cancelled_probe_releases_circuit():
+    guard = open_guard()
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def ok():
+        return 'ok'
+
+    async def scenario():
+        probe = asyncio.ensure_future(guard.acall(hang))
+        await asyncio.sleep(0)
+        probe.cancel()
+        try:
+            await probe
+        except asyncio.CancelledError:
+            pass
+        return await guard.acall(ok)
+
+    assert asyncio.run(scenario()) == 'ok'
+    assert guard.breaker.state == 'closed'
+
+def test_interrupted_sync_probe_releases_circuit():
+    guard = open_guard()
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    try:
+        guard.call(interrupted)
+    except KeyboardInterrupt:
+        pass
+    assert guard.call(lambda: 'ok') == 'ok'
+
+def test_open_circuit_rejects_calls():
+    guard = Resilience(max_attempts=1, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60.0))
+    guard.breaker.record_failure()
+    try:
+        guard.call(lambda: 'ok')
+    except CircuitOpenError:
+        pass
+    else:
+        raise AssertionError("열린 서킷이 호출을 통과시킴")
@@ -0,0 +1,119 @@
+import json
+import logging
+import sys
+import time
+
+import numpy as np
+from scipy import sparse
+
+from chunking import chunk_articles
+import retrieval
+from retrieval import CORPUS_PATH, tokenize
+
+logger = logging.getLogger(__name__)
+
+# 겹치게 나눈 문단에 대한 희소 TF-IDF 행렬 색인
+# - 문단 벡터: (1 + log tf) * idf를 L2 정규화한 CSR 행렬 (문단 수 x 어휘 수)
+# - 점수: 문단 행렬과 질의 벡터의 곱(코사인 유사도)을 SciPy로 한 번에 계산
+# - 여러 질의를 한 행렬로 묶어 한 번의 행렬 곱으로 점수를 매기므로, 오프라인 평가와 실시간 대화가 같은 경로를 사용
+
+INDEX_PATH = 'tfidf_index.pkl'
+INDEX_VERSION = 1
+
+class TfidfIndex:
+    LABEL = 'TF-IDF'
+
+    def __init__(self, passages):
+        self.passages = passages
+        self.vocabulary = {}
+        rows, cols, counts = [], [], []
+        for row, passage in enumerate(passages):
+            tokens = tokenize(passage['title'] + ' ' + passage['text'])
+            for token, count in _count(tokens).items():
+                rows.append(row)
+                cols.append(self.vocabulary.setdefault(token, len(self.vocabulary)))
+                counts.append(count)
+
+        shape = (len(passages), len(self.vocabulary))
+        tf = sparse.csr_matrix((np.asarray(counts, dtype=np.float32), (rows, cols)), shape=shape)
+        document_frequency = np.bincount(tf.indices, minlength=shape[1])
+        self.idf = (np.log((1 + shape[0]) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        tf.data = 1 + np.log(tf.data)
+        self.matrix = _l2_normalize(tf.multiply(self.idf).tocsr())
+
+    @classmethod
+    def from_articles(cls, articles):
+        return cls(chunk_articles(articles))
+
+    def vectorize(self, queries):
+        # 질의 목록 -> (질의 수 x 어휘 수) 정규화된 CSR 행렬 (어휘에 없는 토큰은 무시)
+        rows, cols, counts = [], [], []
+        for row, query in enumerate(queries):
+            for token, count in _count(tokenize(query)).items():
+                col = self.vocabulary.get(token)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+                    counts.append(count)
+        tf = sparse.csr_matrix((np.asarray(counts, dtype=np.float32), (rows, cols)),
+                               shape=(len(queries), len(self.vocabulary)))
+        tf.data = 1 + np.log(tf.data)
+        return _l2_normalize(tf.multiply(self.idf).tocsr())
+
+    def search_batch(self, queries, top_k=3):
+        # 질의마다 (점수, 문단) 목록을 점수 내림차순으로 반환
+        if not queries:
+            return []
+        scores = (self.matrix @ self.vectorize(queries).T).toarray()   # (문단 수 x 질의 수)
+        top_k = min(top_k, scores.shape[0])
+        if top_k == 0:
+            return [[] for _ in queries]
+        top = np.argpartition(-scores, top_k - 1, axis=0)[:top_k]
+        results = []
+        for column in range(scores.shape[1]):
+            candidates = top[:, column]
+            ranked = candidates[np.argsort(-scores[candidates, column], kind='stable')]
+            results.append([(float(scores[i, column]), self.passages[i]) for i in ranked if scores[i, column] > 0])
+        return results
+
+    def search(self, query, top_k=3):
+        return self.search_batch([query], top_k)[0]
+
+def _count(tokens):
+    counts = {}
+    for token in tokens:
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+def _l2_normalize(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms).dot(matrix).tocsr()
+
+def build_index(corpus_path=CORPUS_PATH, index_path=INDEX_PATH):
+    return retrieval.build_index(corpus_path, index_path, TfidfIndex, INDEX_VERSION)
+
+def load_index(corpus_path=CORPUS_PATH, index_path=INDEX_PATH):
+    # 저장/불러오기는 retrieval.load_index와 같음 (색인 클래스와 버전만 다름)
+    return retrieval.load_index(corpus_path, index_path, TfidfIndex, INDEX_VERSION)
+
+if __name__ == "__main__":
+    # 오프라인 평가 예시: 토론 주제 전체를 한 번에 질의
+    # 색인이 __main__.TfidfIndex로 pickle되면 앱에서 불러오지 못하므로 모듈로 다시 import한 load_index 사용
+    from tfidf_index import load_index
+    index = load_index()
+    with open('debate_topics.json', 'r', encoding='utf-8') as f:
+        queries = [topic['topic'] for topic in json.load(f)]
+    if len(sys.argv) > 1:
+        queries = sys.argv[1:]
+
+    start = time.perf_counter()
+    results = index.search_batch(queries)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{len(index.passages)} passages x {len(index.vocabulary)} terms, "
+          f"{len(queries)} queries in {elapsed:.2f} ms ({elapsed / len(queries):.3f} ms/query)")
+    for query, hits in zip(queries, results):
+        print(f"\n{query}")
+        for score, passage in hits:
+            print(f"  {score:.3f}  {passage['title']}: {passage['text'][:60]}...")